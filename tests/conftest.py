@@ -6,14 +6,16 @@ import pytest
 import logging
 from context import gbls
 from context import utils
+from context import sccm
+from context import nvd
+from context import matchven
+from context import matchsft
+from context import vulns
 
-# Initialize execution environment including logging
-@pytest.fixture(scope="module")
-def init_testenv():
-    print("init_testenv: Initialize execution environment.")
-
+# Configure the working directory and logging once per test session
+@pytest.fixture(scope="session", autouse=True)
+def init_logging():
     gbls.wkdir = '/home/jovyan/work/'
-    utils.init_globals()
 
     gbls.loglvl = gbls.LEVELS.get(
             'debug',
@@ -22,9 +24,160 @@ def init_testenv():
     logging.basicConfig(level=gbls.loglvl)
     logger = logging.getLogger(__name__)
     logger.setLevel(gbls.loglvl)
+    return 'Logging initialized'
+
+# Initialize execution environment (globals, plugins)
+@pytest.fixture(scope="session")
+def init_testenv(init_logging):
+    print("init_testenv: Initialize execution environment.")
+
+    utils.init_globals()
+
+    # Keep the worker pools small so the tests do not take every CPU
+    gbls.num_workers = 2
+
+    # Force test AD groups
+    gbls.ad_vip_grps = 'data/ps-ad-vip.csv'
+
     utils.load_plugins()
     return 'Initialized'
 
+######
+#   Raw CSV test data, read once per test session
+######
+
+@pytest.fixture(scope="session")
+def fresh_hosts(init_testenv):
+    hosts = sccm.SccmHosts()
+    hosts.read(mydir="data/df_sys_base.csv")
+    return hosts
+
+@pytest.fixture(scope="session")
+def fresh_sft(init_testenv):
+    sft = sccm.SccmSoft()
+    sft.read(
+        mydir_x86="data/df_v_gs_add_rem_base_x86.csv",
+        mydir_x64="data/df_v_gs_add_rem_base_x64.csv",
+        )
+    return sft
+
+######
+#   Pickled baseline dframes, loaded once per test session
+######
+
+@pytest.fixture(scope="session")
+def baseline_hosts(init_testenv):
+    hosts_base = sccm.SccmHosts()
+    hosts_base.load(mydir="data/df_sys_base.pck")
+    return hosts_base.get()
+
+@pytest.fixture(scope="session")
+def baseline_sft(init_testenv):
+    sft_base = sccm.SccmSoft()
+    sft_base.load(mydir="data/df_v_gs_add_rem_base.pck")
+    return sft_base.get()
+
+@pytest.fixture(scope="session")
+def baseline_cpe(init_testenv):
+    cpe_base = nvd.NvdCpe()
+    cpe_base.load(mypck="data/df_cpe4_base.pck")
+    return cpe_base.get()
+
+@pytest.fixture(scope="session")
+def baseline_cve(init_testenv):
+    cve_base = nvd.NvdCve()
+    cve_base.load(mypck="data/df_cve_base.pck")
+    return cve_base.get()
+
+@pytest.fixture(scope="session")
+def baseline_match_vendor(init_testenv):
+    match_vendor_base = matchven.MatchVendor()
+    match_vendor_base.load(mypck='data/df_match_vendor_baseline.pck')
+    return match_vendor_base.get()
+
+@pytest.fixture(scope="session")
+def baseline_match_sft(init_testenv):
+    match_soft_base = matchsft.MatchSoft()
+    match_soft_base.load(mypck='data/df_match_sft_baseline.pck')
+    return match_soft_base.get()
+
+@pytest.fixture(scope="session")
+def baseline_match_vulns(init_testenv):
+    match_vulns_base = vulns.MatchVulns()
+    match_vulns_base.load('data/df_match_vulns_baseline.pck')
+    return match_vulns_base.get()
+
+######
+#   Mock http response bodies, read once per test session
+######
+
+def _read_test_file(my_file):
+    # Read flat file as a string to return as mock http response
+    try:
+        with open(my_file, "rb") as myfile:
+            mybuf = myfile.read()
+    except Exception as e:
+        print (e)
+        mybuf = None
+    return mybuf
+
+@pytest.fixture(scope="session")
+def cpe_zip_body():
+    return _read_test_file("data/official-cpe-dictionary_v2.3.xml.base.zip")
+
+@pytest.fixture(scope="session")
+def cve_xml_body():
+    return _read_test_file("data/cve_xml_base.zip")
+
+@pytest.fixture(scope="session")
+def cve_meta_bodies():
+    # Indexed by yr offset: 0 - current yr, 1 - last yr
+    return (
+        _read_test_file("data/cve_meta_base0"),
+        _read_test_file("data/cve_meta_base1")
+        )
+
+######
+#   Matching test inputs and baselines
+######
+
+@pytest.fixture(scope="session")
+def init_matching(
+        init_testenv,
+        baseline_cve,
+        baseline_match_vendor,
+        baseline_match_sft
+        ):
+
+    print('init_matching: Initialize for matching.')
+
+    sft = sccm.SccmSoft()
+    sft.load(mydir='data/df_match_sccm.pck')
+    df_sft = sft.get()
+    print ('Match tests: Software inventory file initialized')
+
+    cpe = nvd.NvdCpe()
+    cpe.load(mypck='data/df_match_cpe4.pck')
+    df_cpe = cpe.get(copy=False)
+    print ('Match tests: NVD CPE file initialized')
+
+    # cve dframe is shared: tests which modify it must take a copy
+    df_cve = baseline_cve
+    print ('Match tests: NVD CVE file initialized')
+
+    # Vendor, software matching baseline comparison dframes
+    df_match_vendor_base = baseline_match_vendor
+    df_match_sft_base = baseline_match_sft
+    print ('Match tests: Match baseline dframes initialized')
+
+    return (
+        df_sft,
+        df_cpe,
+        df_cve,
+        df_match_vendor_base,
+        df_match_sft_base
+        )
+
 # def pytest_configure(config):
 #     import vulnmine
 #     vulnmine._called_from_test = True
@@ -32,4 +185,3 @@ def init_testenv():
 # def pytest_unconfigure(config):
 #     import vulnmine  # This was missing from the manual
 #     del vulnmine._called_from_test
-
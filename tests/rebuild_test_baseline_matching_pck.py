@@ -3,6 +3,7 @@
 
 # This rtn rebuilds match data sets, execution is quite long.
 
+import pytest
 import logging
 from context import gbls
 from context import utils
@@ -49,7 +50,7 @@ def test_run():
 
     cpe = nvd.NvdCpe()
     cpe.read(my_cpe='data/match_official-cpe-dictionary_v2.3.xml')
-    df_cpe = cpe.get()
+    df_cpe = cpe.get(copy=False)
     df_cpe.to_pickle('data/df_match_cpe4.pck')
     print ('Match tests: NVD CPE file initialized')
 
@@ -89,7 +90,7 @@ def test_run():
             df_sft,
             df_cpe
             )
-    df_match_sft = match_soft.get()
+    df_match_sft = match_soft.get(copy=False)
     df_match_sft.to_pickle('data/df_match_sft_baseline.pck')
     print ('Match tests: Software match dframe initialized')
 
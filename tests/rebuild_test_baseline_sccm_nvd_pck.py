@@ -4,6 +4,7 @@
 # This rtn rebuilds sccm, nvd test data sets.
 
 from yapsy.PluginManager import PluginManager
+import pytest
 import logging
 from context import gbls
 from context import utils
@@ -15,6 +16,10 @@ def init_testenv():
     print("init_testenv: Initialize execution environment.")
     gbls.wkdir = '/home/jovyan/work/'
     utils.init_globals()
+
+    # Force test AD groups
+    gbls.ad_vip_grps = 'data/ps-ad-vip.csv'
+
     gbls.loglvl = gbls.LEVELS.get(
             'debug',
             logging.NOTSET
@@ -48,11 +53,8 @@ def test_run():
     hosts.read(mydir='data/df_sys_base.csv')
     hosts.save()
 
-    gbls.ad_vip_grps = 'data/ps-ad-vip.csv'
-
     # Invoke Input plugin for customized I/P data
-    plugin1 = gbls.plugin_manager.getPluginByName(gbls.PLUGINIP)
-    plugin1.plugin_object.modify_hosts(hosts)
+    gbls.plugin_input.modify_hosts(hosts)
 
     df_hosts = hosts.get()
     df_hosts.to_pickle('data/df_sys_base.pck')
@@ -3,6 +3,7 @@ import pandas as pd
 
 import time
 import datetime
+import calendar
 import os
 
 import filecmp
@@ -17,6 +18,9 @@ from context import gbls
 from context import utils
 from context import nvd
 
+# Timestamp (UTC) used to age a file so that it is considered out of date
+OLD_TS = calendar.timegm(datetime.datetime(2011, 12, 1).timetuple())
+
 
 class TestNvdCpe:
 
@@ -26,27 +30,16 @@ class TestNvdCpe:
 
     @responses.activate
 
-    def test_cpe1(self, init_testenv):
+    def test_cpe1(self, init_testenv, cpe_zip_body):
         if init_testenv != "Initialized":
             exit('nvd - TestNvdCpe initialization failed, exiting')
 
-        # Read flat file as a string to return as mock http response
-        try:
-            with open(
-                "data/official-cpe-dictionary_v2.3.xml.base.zip",
-                "rb"
-                ) as myfile:
-                mybuf = myfile.read()
-        except Exception as e:
-            print (e)
-            mybuf = None
-
         # Set up mock http response to return test file
 
         responses.add(
                 responses.GET,
                 gbls.url_cpe,
-                body=mybuf,
+                body=cpe_zip_body,
                 status=200,
                 content_type='application/x-zip-compressed'
                 )
@@ -58,17 +51,9 @@ class TestNvdCpe:
         # past to force "download"
 
         if os.path.isfile(my_cpe):
-            s = "01/12/2011"
-            my_tm_stamp = time.mktime(
-                datetime.datetime.strptime(
-                    s,
-                    "%d/%m/%Y"
-                ).timetuple()
-            )
-
             os.utime(
                 my_cpe,
-                (my_tm_stamp, my_tm_stamp)
+                (OLD_TS, OLD_TS)
                 )
 
         # "Download" the test zip file
@@ -80,11 +65,39 @@ class TestNvdCpe:
 
         assert filecmp.cmp(
                     my_cpe,
-                    'data/official-cpe-dictionary_v2.3.base.xml',
-                    False
+                    'data/official-cpe-dictionary_v2.3.base.xml'
                     )
 
-    def test_cpe2(self, init_testenv):
+    @responses.activate
+
+    def test_cpe_bad_zip(self, init_testenv, tmpdir):
+        """ A bad archive must leave the existing XML file untouched """
+        if init_testenv != "Initialized":
+            exit('nvd - TestNvdCpe initialization failed, exiting')
+
+        # Set up mock http response to return a body that is not a zip file
+
+        responses.add(
+                responses.GET,
+                gbls.url_cpe,
+                body='This is not a zip archive',
+                status=200,
+                content_type='application/x-zip-compressed'
+                )
+
+        # Existing target file which should survive the failed download
+        my_dest = str(tmpdir.join('dest.xml'))
+        with open(my_dest, 'wb') as fd:
+            fd.write('<cpe-list></cpe-list>\n')
+
+        assert utils.get_zip_to(gbls.url_cpe, my_dest) is None
+
+        with open(my_dest, 'rb') as fd:
+            assert fd.read() == '<cpe-list></cpe-list>\n'
+
+        assert not os.path.exists(my_dest + '.tmp')
+
+    def test_cpe2(self, init_testenv, baseline_cpe):
         if init_testenv != "Initialized":
             exit('nvd - Initialization failed, exiting')
 
@@ -93,12 +106,8 @@ class TestNvdCpe:
         cpe.read(my_cpe='data/official-cpe-dictionary_v2.3.base.xml')
         df_cpe_processed = cpe.get()
 
-        # load up base dframe for comparison
-        cpe.load(mypck="data/df_cpe4_base.pck")
-        df_cpe_base = cpe.get()
-
         # Check calculated dframe against base dframe
-        assert df_cpe_base.equals(df_cpe_processed)
+        assert baseline_cpe.equals(df_cpe_processed)
 
 
 class TestNvdCve:
@@ -109,50 +118,38 @@ class TestNvdCve:
 
     @responses.activate
 
-    def test_cve_download(self, init_testenv):
+    def test_cve_download(
+            self,
+            init_testenv,
+            cve_xml_body,
+            cve_meta_bodies
+            ):
         """ Test the CVE download function over multiple yrs / conditions """
         if init_testenv != "Initialized":
             exit('nvd - TestNvdCve initialization failed, exiting')
 
-        def mock_http(my_url, my_file, my_content_type):
+        def mock_http(my_url, my_body, my_content_type):
             """ Set up a mock http file download """
 
-            # Read flat file as a string to return as mock http response
-            print("Entering mock_http: {0}, {1}, {2}".format(
-                                                            my_url,
-                                                            my_file,
-                                                            my_content_type
-                                                            )
-                )
-            try:
-                with open(
-                    my_file,
-                    "rb"
-                    ) as myfile:
-                    mybuf = myfile.read()
-
-                    # print 1st 50 lines i/p
-                    if '.zip' in my_file:
-                        print("mock_http: Download of {0}".format(my_file))
-                    else:
-                        print("mock_http:\n{0}\n\n".format(
-                                                    mybuf[:1000]
+            print("Entering mock_http: {0}, {1}".format(
+                                                    my_url,
+                                                    my_content_type
                                                     )
-                            )
-            except Exception as e:
-                print (e)
-                mybuf = None
+                )
 
             # Set up mock http response to return test file
 
             responses.add(
                     responses.GET,
                     my_url,
-                    body=mybuf,
+                    body=my_body,
                     status=200,
                     content_type=my_content_type
                     )
 
+        # Determine current yr once for all the yrs processed
+        current_yr = datetime.datetime.now().year
+
         def set_fnames_urls(my_index):
             """Set the filenames and urls for a given yr"""
 
@@ -162,16 +159,13 @@ class TestNvdCve:
                 return (None, None, None)
 
             # Determine yr being processed
-            now = datetime.datetime.now()
-            my_yr = now.year
-
-            yr_processed = my_yr - my_index
+            yr_processed = str(current_yr - my_index)
 
             # Target meta file
             meta_dest_filename = (
                             gbls.nvddir
                             + gbls.nvd_meta_filename
-                            + str(yr_processed)
+                            + yr_processed
                             )
             # Base meta file (used for comparison)
             meta_base_filename = "data/cve_meta_base" + str(my_index)
@@ -179,7 +173,7 @@ class TestNvdCve:
             # URL for mock download of CVE meta file
             url_meta = (
                     gbls.url_meta_base
-                    + str(yr_processed)
+                    + yr_processed
                     + gbls.url_meta_end
                     )
 
@@ -187,21 +181,21 @@ class TestNvdCve:
 
             mock_http(
                 url_meta,
-                meta_base_filename,
+                cve_meta_bodies[my_index],
                 "text/plain"
                 )
 
             # URL to read the corresponding CVE XML feed file
             url_xml = (
                         gbls.url_xml_base
-                        + str(yr_processed)
+                        + yr_processed
                         + gbls.url_xml_end
                         )
 
             # Target cve xml file
             cve_filename = (
                 gbls.nvdcve
-                + str(yr_processed)
+                + yr_processed
                 + '.xml'
                 )
 
@@ -290,7 +284,7 @@ class TestNvdCve:
 
         mock_http(
             url_xml,
-            'data/cve_xml_base.zip',
+            cve_xml_body,
             'application/x-zip-compressed'
             )
 
@@ -302,14 +296,13 @@ class TestNvdCve:
 
         assert filecmp.cmp(
                     cve_filename,
-                    'data/cve_xml_base',
-                    False
+                    'data/cve_xml_base'
                     )
 
         # Force an error for debugging test harness code
         # assert False
 
-    def test_cve_read(self, init_testenv):
+    def test_cve_read(self, init_testenv, baseline_cve):
         """ Test the CVE parsing function """
         if init_testenv != "Initialized":
             exit('nvd - TestNvdCve initialization failed, exiting')
@@ -319,12 +312,8 @@ class TestNvdCve:
         cve.read(my_dir="data/")
         df_cve_processed = cve.get()
 
-        # load up base dframe for comparison
-        cve.load(mypck="data/df_cve_base.pck")
-        df_cve_base = cve.get()
-
         # Check calculated dframe against base dframe
-        assert df_cve_base.equals(df_cve_processed)
+        assert baseline_cve.equals(df_cve_processed)
 
         # Force failure for debugging o/p
         # assert False
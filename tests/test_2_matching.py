@@ -11,52 +11,6 @@ from context import vulns
 
 class TestMatch:
 
-    ######
-    #   Fixtures for initialization of tests
-    ######
-
-    @pytest.fixture(scope='class')
-    def init_matching(self):
-
-        print('init_matching: Initialize for matching.')
-
-        sft = sccm.SccmSoft()
-        sft.load(mydir='data/df_match_sccm.pck')
-        df_sft = sft.get()
-        print ('Match tests: Software inventory file initialized')
-
-        cpe = nvd.NvdCpe()
-        cpe.load(mypck='data/df_match_cpe4.pck')
-        df_cpe = cpe.get()
-        print ('Match tests: NVD CPE file initialized')
-
-        # Load cve dframe
-        cve = nvd.NvdCve()
-        cve.load(mypck="data/df_cve_base.pck")
-        df_cve = cve.get()
-        print ('Match tests: NVD CVE file initialized')
-
-        # Vendor matching baseline comparison dframe
-        match_vendor_base = matchven.MatchVendor()
-        match_vendor_base.load(mypck='data/df_match_vendor_baseline.pck')
-        df_match_vendor_base = match_vendor_base.get()
-        print ('Match tests: Vendor match baseline dframe initialized')
-
-        # Software matching baseline comparison dframe
-        match_soft_base = matchsft.MatchSoft()
-        match_soft_base.load(mypck='data/df_match_sft_baseline.pck')
-        df_match_sft_base = match_soft_base.get()
-        print ('Match tests: Software match baseline dframe initialized')
-
-
-        return (
-            df_sft,
-            df_cpe,
-            df_cve,
-            df_match_vendor_base,
-            df_match_sft_base
-            )
-
     ######
     #   Test routines - matchven.MatchVendor
     ######
@@ -105,7 +59,7 @@ class TestMatch:
                 df_sft,
                 df_cpe
                 )
-        df_match_sft = match_soft.get()
+        df_match_sft = match_soft.get(copy=False)
 
         # check equality
         assert df_match_sft_base.equals(df_match_sft)
@@ -113,7 +67,13 @@ class TestMatch:
         # Force failure for debugging o/p
         # assert False
 
-    def test_match_vulns(self, init_testenv, init_matching):
+    def test_match_vulns(
+            self,
+            init_testenv,
+            init_matching,
+            baseline_hosts,
+            baseline_match_vulns
+            ):
         """Test the software matching logic """
         if init_testenv != 'Initialized':
             exit('test_match_vendor - Initialization failed, exiting')
@@ -126,28 +86,115 @@ class TestMatch:
         ) = init_matching
 
         # Need hosts inventory as well
-        hosts = sccm.SccmHosts()
-        hosts.load(mydir="data/df_sys_base.pck")
-        df_hosts = hosts.get()
+        df_hosts = baseline_hosts
 
         # Fire up the code to be tested
         match_vulns = vulns.MatchVulns()
 
+        # data_merge modifies the cve dframe in place
         match_vulns.data_merge(
-                df_cve,
+                df_cve.copy(),
                 df_match_sft_base,
                 df_sft,
                 df_hosts
                 )
         df_match_vulns = match_vulns.get()
 
-        # Load baseline comparison dframe
-        match_vulns_base = vulns.MatchVulns()
-        match_vulns_base.load('data/df_match_vulns_baseline.pck')
-        df_match_vulns_base = match_vulns_base.get()
-
         # check equality
-        assert df_match_vulns_base.equals(df_match_vulns)
+        assert baseline_match_vulns.equals(df_match_vulns)
 
         # Force failure for debugging o/p
         # assert False
+
+
+######
+#   Parallel and serial matching must give the same results
+######
+
+def _tag_item(my_item):
+    # Module-level so that it can be pickled for the worker processes
+    return (my_item, my_item * my_item)
+
+
+class TestParallel:
+
+    def _run_with_workers(self, num_workers, my_func):
+        # Run my_func with gbls.num_workers set, then restore the setting
+        saved_workers = gbls.num_workers
+        gbls.num_workers = num_workers
+        try:
+            return my_func()
+        finally:
+            gbls.num_workers = saved_workers
+
+    def test_parallel_map(self, init_testenv):
+        """Serial and pooled parallel_map give the same ordered results"""
+        if init_testenv != 'Initialized':
+            exit('test_parallel_map - Initialization failed, exiting')
+
+        lst_items = range(50, 0, -1)
+
+        lst_serial = self._run_with_workers(
+                            1,
+                            lambda: utils.parallel_map(_tag_item, lst_items)
+                            )
+        lst_pool = self._run_with_workers(
+                            2,
+                            lambda: utils.parallel_map(_tag_item, lst_items)
+                            )
+
+        assert lst_serial == [_tag_item(t_item) for t_item in lst_items]
+        assert lst_pool == lst_serial
+
+    def test_match_vendor_workers(self, init_testenv, init_matching):
+        """Vendor matching is the same with 1 and 2 worker processes"""
+        if init_testenv != 'Initialized':
+            exit('test_match_vendor_workers - Initialization failed, exiting')
+
+        (df_sft,
+        df_cpe,
+        df_cve,
+        df_match_vendor_base,
+        df_match_sft_base
+        ) = init_matching
+
+        def myfn_match():
+            match_vendor = matchven.MatchVendor()
+            match_vendor.match(
+                        df_cpe,
+                        df_sft
+                        )
+            return match_vendor.get()
+
+        df_serial = self._run_with_workers(1, myfn_match)
+        df_pool = self._run_with_workers(2, myfn_match)
+
+        assert df_serial.equals(df_pool)
+        assert df_match_vendor_base.equals(df_serial)
+
+    def test_match_soft_workers(self, init_testenv, init_matching):
+        """Software matching is the same with 1 and 2 worker processes"""
+        if init_testenv != 'Initialized':
+            exit('test_match_soft_workers - Initialization failed, exiting')
+
+        (df_sft,
+        df_cpe,
+        df_cve,
+        df_match_vendor_base,
+        df_match_sft_base
+        ) = init_matching
+
+        def myfn_match():
+            match_soft = matchsft.MatchSoft()
+            match_soft.match(
+                    df_match_vendor_base,
+                    df_sft,
+                    df_cpe
+                    )
+            return match_soft.get(copy=False)
+
+        df_serial = self._run_with_workers(1, myfn_match)
+        df_pool = self._run_with_workers(2, myfn_match)
+
+        assert df_serial.equals(df_pool)
+        assert df_match_sft_base.equals(df_serial)
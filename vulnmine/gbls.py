@@ -113,6 +113,21 @@ nvddir = ''
 clf_vendor = ''
 clf_software = ''
 
+######
+#   Parallel processing
+######
+
+#   Number of worker processes used for the fuzzy matching.
+#   0 means use all available CPUs, 1 disables parallel processing.
+num_workers = 0
+
+#   Number of jobs used by the Random Forest models to predict.
+#   -1 means use all available CPUs.
+rf_n_jobs = -1
+
+#   Number of threads used to download the yearly NVD CVE files.
+nvd_download_threads = 8
+
 ######
 #   Fields for the ML classification
 ######
@@ -120,9 +135,12 @@ clf_software = ''
 # Important note: These fields *must* be kept in this order since that is
 # how the ML algorithm was originally trained.
 
+# The field definitions are tuples so that they cannot be modified by
+# accident. Convert with list() where pandas needs a list of columns.
+
 #   Vendor data fields
-vendor_key_list = ['publisher0', 'vendor_X']
-vendor_feature_list = [
+vendor_key_list = ('publisher0', 'vendor_X')
+vendor_feature_list = (
                       'fz_ptl_ratio',
                       'fz_ptl_tok_sort_ratio',
                       'fz_ratio',
@@ -130,21 +148,21 @@ vendor_feature_list = [
                       'fz_uwratio',
                       'ven_len',
                       'pu0_len'
-                      ]
-vendor_token_list = ['pub0_cln', 'ven_cln']
+                      )
+vendor_token_list = ('pub0_cln', 'ven_cln')
 vendor_attr_list = vendor_key_list + vendor_feature_list + vendor_token_list
 
 
 #   Software data fields
-sft_key_list = [
+sft_key_list = (
                 'vendor_X',
                 'software_X',
                 'title_X',
                 'DisplayName0',
                 'release_X',
                 'Version0'
-                ]
-sft_feature_list = [
+                )
+sft_feature_list = (
                     'fz_ratio',
                     'fz_ptl_ratio',
                     'fz_tok_set_ratio',
@@ -154,9 +172,9 @@ sft_feature_list = [
                     'fz_rel_ptl_ratio',
                     'titlX_len',
                     'DsplyNm0_len'
-                    ]
+                    )
 
-sft_attr_list = sft_key_list + sft_feature_list + ['t_cve_name']
+sft_attr_list = sft_key_list + sft_feature_list + ('t_cve_name',)
 
 ######
 #   Plugins
@@ -174,5 +192,13 @@ PLUGINRPT = 'Plugin Report'
 #   Global plugin manager object
 plugin_manager = None
 
+#   Plugin objects of the loaded input and report plugins
+plugin_input = None
+plugin_rpt = None
+
+#   (plugin folder, folder modification time) when the plugins were last
+#   loaded
+plugin_folder_key = None
+
 #   Global plugin function switch
 activate_plugins = True
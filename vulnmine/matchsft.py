@@ -35,6 +35,7 @@ MatchSoft     Match NVD CPE "Software" data to SCCM "Software" inventory data
 """
 import re
 from time import time
+from itertools import izip
 
 import pandas as pd
 import numpy as np
@@ -42,7 +43,7 @@ import numpy as np
 import sys
 
 from fuzzywuzzy import fuzz as fz
-from sklearn.externals import joblib
+from fuzzywuzzy import utils as fz_utils
 
 import logging
 
@@ -57,6 +58,317 @@ __all__ = (
         'MatchSoft'
         )
 
+# Java CPE release patterns, used to normalize Java release data:
+#   release is of form 'update[_]nn'
+_JAVA_UPDATE_RE = re.compile(
+                    r'cpe:2.3:a:(oracle|sun):'
+                    r'(?P<sft>(jdk|jre)):'
+                    r'1.(?P<rel>[\d\.]*):'
+                    r'update[_]*(?P<upd>[\d]*)',
+                    re.IGNORECASE | re.UNICODE
+                    )
+#   only 'release' is provided
+_JAVA_REL_RE = re.compile(
+                    r'cpe:2.3:a:'
+                    r'(oracle|sun):'
+                    r'(?P<sft>(jdk|jre)):'
+                    r'1.(?P<rel>[\d\.\_]*):',
+                    re.IGNORECASE | re.UNICODE
+                    )
+
+
+# Columns of the software cartesian product
+_MATCH_COLS = (
+            'vendor_X',
+            'software_X',
+            'title_X',
+            'DisplayName0',
+            'release_X',
+            'Version0',
+            'fz_ratio',
+            'fz_ptl_ratio',
+            'fz_tok_set_ratio',
+            'fz_ptl_tok_sort_ratio',
+            'fz_uwratio',
+            'fz_rel_ratio',
+            'fz_rel_ptl_ratio',
+            't_cve_name'
+            )
+
+
+######
+# Utility Function to handle Java 'Release' data programmatically
+######
+
+def _fix_java_rel(my_cpe_sft):
+
+    # Java "release" data has varied widely over the years. The
+    # transition from Sun to Oracle complicated things further.
+    #
+    # This rtn attempts to deal with the exception cases in order
+    # to normalize the data.
+
+    # handle cases where release is of form 'update[_]nn'
+
+    if 'update' in my_cpe_sft:
+        my_match = _JAVA_UPDATE_RE.search(my_cpe_sft)
+
+        if my_match:
+            sft = my_match.group('sft')
+            rel = my_match.group('rel')
+            upd = my_match.group('upd')
+
+            tmp_str = (
+                        my_match.group('rel')
+                        + '.'
+                        + my_match.group('upd')
+                        + '0'
+                        )
+
+        # if no match, then either not jre/jdk or version info missing
+
+        else:
+            return '-'
+
+    # the other possibilities is that only 'release' is provided
+    else:
+        my_match = _JAVA_REL_RE.search(my_cpe_sft)
+
+        if my_match:
+            sft = my_match.group('sft')
+            rel = my_match.group('rel')
+
+            tmp_str = my_match.group('rel')
+
+        # if no match, then either not jre/jdk or version info missing
+        else:
+            return '-'
+
+    # Handle case of a really old version: Has embedded '_'
+    if '_' in rel:
+        return ('1.' + rel)
+
+    # JRE version is good 'as is'
+    elif sft == 'jre':
+                return(tmp_str)
+
+    # JDKS up to / including 1.7.x have release 1.7.x
+    # JDKS 1.8.x have release '8.x'
+
+    elif sft == 'jdk':
+
+        if rel.startswith('8.'):
+            return tmp_str
+        else:
+            return('1.' + tmp_str)
+    else:
+        logging.getLogger(__name__).info('*** error rtn java')
+
+
+######
+# Pre-process strings for the token based fuzzy matching statistics
+######
+
+def _process_tokens(my_str):
+
+    # fuzzywuzzy's token scorers clean up and tokenize both strings on
+    # every call. Do this once per string instead:
+    #   (cleaned string, cleaned string with its tokens sorted)
+    #
+    # partial_token_set_ratio(..., full_process=False) on the cleaned
+    # strings, and ratio on the sorted strings, give the same results as
+    # partial_token_set_ratio and token_sort_ratio on the raw strings.
+
+    my_proc = fz_utils.full_process(my_str, force_ascii=False)
+    return (my_proc, u' '.join(sorted(my_proc.split())).strip())
+
+
+######
+# Score the cartesian product for one vendor
+######
+
+def _score_vendor_sft(my_block):
+    """Form and score the cartesian product of one vendor's software.
+
+    Parameters
+    ----------
+    my_block    Tuple of:
+                - CPE vendor
+                - list of SCCM DisplayName0 strings for this vendor
+                - list of the corresponding SCCM Version0 strings
+                - tuple of CPE software, release, release for matching,
+                  title and cve name arrays for this vendor
+
+    Returns
+    -------
+    dict_match  Potential matches for this vendor: a dict of equal length
+                lists keyed by the _MATCH_COLS column names, one entry per
+                (SCCM display name, CPE software) pair that passed the
+                heuristics. Pairs are in SCCM input order, then CPE software
+                order.
+
+                The caller extends its own lists column by column with each
+                block's dict, in block order, and builds the cartesian
+                product frame with columns=_MATCH_COLS.
+
+    """
+    (
+        t_cpe_vdr_X,
+        a_ar_dsply0,
+        a_ar_ver0,
+        (
+            a_cpe_sft_X,
+            a_cpe_relX,
+            a_cpe_relX_match,
+            a_cpe_titleX,
+            a_cve_name
+            )
+        ) = my_block
+
+    dict_match = dict((col, []) for col in _MATCH_COLS)
+
+    # don't consider vendor name in fuzzy matching
+    a_cpe_titleX_tmp = [
+            t_cpe_titleX.lower().replace(t_cpe_vdr_X, ' ')
+            for t_cpe_titleX in a_cpe_titleX
+            ]
+    a_cpe_titleX_tok = [
+            _process_tokens(t_cpe_titleX_tmp)
+            for t_cpe_titleX_tmp in a_cpe_titleX_tmp
+            ]
+
+    # SCCM names recur with different releases: tokenize each one once
+    dict_dsply0_tok = {}
+
+    for (t_ar_dsply0, t_ar_ver0) in izip(a_ar_dsply0, a_ar_ver0):
+
+        t_ar_dsply0_tmp = t_ar_dsply0.lower().replace(
+                                                t_cpe_vdr_X,
+                                                ' '
+                                                )
+        try:
+            (t_ar_dsply0_proc, t_ar_dsply0_sort) = dict_dsply0_tok[
+                                                        t_ar_dsply0_tmp
+                                                        ]
+        except KeyError:
+            (t_ar_dsply0_proc, t_ar_dsply0_sort) = _process_tokens(
+                                                        t_ar_dsply0_tmp
+                                                        )
+            dict_dsply0_tok[t_ar_dsply0_tmp] = (
+                                        t_ar_dsply0_proc,
+                                        t_ar_dsply0_sort
+                                        )
+
+        for (
+                t_cpe_sft_X,
+                t_cpe_relX,
+                t_cpe_relX_tmp,
+                t_cpe_titleX,
+                t_cpe_titleX_tmp,
+                (t_cpe_titleX_proc, t_cpe_titleX_sort),
+                t_cve_name
+                ) in izip(
+                        a_cpe_sft_X,
+                        a_cpe_relX,
+                        a_cpe_relX_match,
+                        a_cpe_titleX,
+                        a_cpe_titleX_tmp,
+                        a_cpe_titleX_tok,
+                        a_cve_name
+                        ):
+
+            ######
+            #   Apply quick heuristics to reduce the number of
+            #   possible matches
+            ######
+
+            # 1) Release #'s should at least partially match
+
+            # A partial ratio of 100 means that the shorter release
+            # string occurs as is in the longer one. Check this
+            # cheaply first to avoid the fuzzy scoring when it
+            # cannot succeed.
+
+            if (
+                    isinstance(t_cpe_relX_tmp, basestring)
+                    and isinstance(t_ar_ver0, basestring)
+                    and (t_cpe_relX_tmp != '-')
+                    and (t_ar_ver0 != '-')
+                    ):
+                if len(t_cpe_relX_tmp) <= len(t_ar_ver0):
+                    if t_cpe_relX_tmp not in t_ar_ver0:
+                        continue
+                elif t_ar_ver0 not in t_cpe_relX_tmp:
+                    continue
+
+            fz_rel_ratio = fz.ratio(
+                                t_cpe_relX_tmp,
+                                t_ar_ver0
+                                )
+            fz_rel_ptl_ratio = fz.partial_ratio(
+                                        t_cpe_relX_tmp,
+                                        t_ar_ver0
+                                        )
+
+            if (t_cpe_relX_tmp != '-') and (t_ar_ver0 != '-'):
+
+                # If release data is specified, then check that
+                # there is at least a partial match
+
+                if fz_rel_ratio < 90 or fz_rel_ptl_ratio < 100:
+                    continue
+
+            # 2) There should be at least one occurence of one word in
+            # the cpe full name somewhere in sccm full name
+
+            fz_ptl_tok_set_ratio = fz.partial_token_set_ratio(
+                                        t_cpe_titleX_proc,
+                                        t_ar_dsply0_proc,
+                                        force_ascii=False,
+                                        full_process=False
+                                        )
+
+            if fz_ptl_tok_set_ratio < 70:
+                continue
+
+            ######
+            # calculate fuzzy matching statistics for this match
+            ######
+
+            dict_match['vendor_X'].append(t_cpe_vdr_X)
+            dict_match['software_X'].append(t_cpe_sft_X)
+            dict_match['Version0'].append(t_ar_ver0)
+            dict_match['release_X'].append(t_cpe_relX)
+            dict_match['title_X'].append(t_cpe_titleX)
+            dict_match['DisplayName0'].append(t_ar_dsply0)
+
+            dict_match['fz_ratio'].append(fz.ratio(
+                                            t_cpe_titleX_tmp,
+                                            t_ar_dsply0_tmp
+                                            ))
+            dict_match['fz_ptl_ratio'].append(fz.partial_ratio(
+                                            t_cpe_titleX_tmp,
+                                            t_ar_dsply0_tmp
+                                            ))
+            dict_match['fz_tok_set_ratio'].append(
+                                            fz_ptl_tok_set_ratio
+                                            )
+            dict_match['fz_ptl_tok_sort_ratio'].append(
+                                        fz.ratio(
+                                            t_cpe_titleX_sort,
+                                            t_ar_dsply0_sort
+                                            ))
+            dict_match['fz_uwratio'].append(fz.UWRatio(
+                                            t_cpe_titleX_tmp,
+                                            t_ar_dsply0_tmp
+                                            ))
+
+            dict_match['fz_rel_ratio'].append(fz_rel_ratio)
+            dict_match['fz_rel_ptl_ratio'].append(fz_rel_ptl_ratio)
+            dict_match['t_cve_name'].append(t_cve_name)
+
+    return dict_match
+
 
 class MatchSoft(object):
     """Match NVD CPE "Software" data to SCCM "Software" inventory data.
@@ -177,9 +489,17 @@ class MatchSoft(object):
         self.df_match_cpe_sft.to_pickle(gbls.df_match_cpe_sft_pck)
         return None
 
-    def get(self):
-        """Return a *copy* of the dataframe."""
-        df_tmp = self.df_match_cpe_sft.copy()
+    def get(self, copy=True):
+        """Return a *copy* of the dataframe.
+
+        copy=False returns the dataframe itself, for callers which only read
+        it.
+
+        """
+        if copy:
+            df_tmp = self.df_match_cpe_sft.copy()
+        else:
+            df_tmp = self.df_match_cpe_sft
         self.logger.info(
                 '\n\nGet MatchVendor.df_match_cpe_sft: \n{0}\n{1}\n\n'.format(
                                 df_tmp.shape,
@@ -205,7 +525,7 @@ class MatchSoft(object):
                 - Missing values are initialized.
                 - Vendor_Publisher correspondance dataframe is used to add
                   CPE Vendor to the SCCM record.
-                - Data is grouped and sorted.
+                - Distinct vendor / software / release tuples are sorted.
 
         *  Likewise the CPE Software data is prepared for ML Classification.
            Extraneous columns are dropped and data is grouped / sorted.
@@ -247,102 +567,20 @@ class MatchSoft(object):
         None
 
         """
-        ######
-        # Utility Function to handle Java 'Release' data programmatically
-        ######
-
-        def _fix_java_rel(my_cpe_sft):
-
-            # Java "release" data has varied widely over the years. The
-            # transition from Sun to Oracle complicated things further.
-            #
-            # This rtn attempts to deal with the exception cases in order
-            # to normalize the data.
-
-            # handle cases where release is of form 'update[_]nn'
-
-            if 'update' in my_cpe_sft:
-                pattern = re.compile(
-                                'cpe:2.3:a:(oracle|sun):'
-                                '(?P<sft>(jdk|jre)):'
-                                '1.(?P<rel>[\d\.]*):'
-                                'update[_]*(?P<upd>[\d]*)',
-                                re.IGNORECASE | re.UNICODE
-                                )
-
-                my_match = pattern.search(my_cpe_sft)
-
-                if my_match:
-                    sft = my_match.group('sft')
-                    rel = my_match.group('rel')
-                    upd = my_match.group('upd')
-
-                    tmp_str = (
-                                my_match.group('rel')
-                                + '.'
-                                + my_match.group('upd')
-                                + '0'
-                                )
-
-                # if no match, then either not jre/jdk or version info missing
-
-                else:
-                    return '-'
-
-            # the other possibilities is that only 'release' is provided
-            else:
-                pattern = re.compile(
-                            'cpe:2.3:a:'
-                            '(oracle|sun):'
-                            '(?P<sft>(jdk|jre)):'
-                            '1.(?P<rel>[\d\.\_]*):',
-                            re.IGNORECASE | re.UNICODE
-                            )
-
-                my_match = pattern.search(my_cpe_sft)
-
-                if my_match:
-                    sft = my_match.group('sft')
-                    rel = my_match.group('rel')
-
-                    tmp_str = my_match.group('rel')
-
-                # if no match, then either not jre/jdk or version info missing
-                else:
-                    return '-'
-
-            # Handle case of a really old version: Has embedded '_'
-            if '_' in rel:
-                return ('1.' + rel)
-
-            # JRE version is good 'as is'
-            elif sft == 'jre':
-                        return(tmp_str)
-
-            # JDKS up to / including 1.7.x have release 1.7.x
-            # JDKS 1.8.x have release '8.x'
-
-            elif sft == 'jdk':
-
-                if rel.startswith('8.'):
-                    return tmp_str
-                else:
-                    return('1.' + tmp_str)
-            else:
-                self.logger.info('*** error rtn java')
-
         # Prepare the SCCM data for ML classification
 
         def _match_prepare_sccm_data(
                             df_add_rem_g,
-                            df_match_vendor1
+                            df_match_vendor1,
+                            dict_cpeSoft
                             ):
 
             # Prepare sccm data for 2cd phase of machine learning matching
             # - Clean and normalize SCCM software data. Remove extraneous
             #   columns.
             # - Add CPE Vendor_X based on Publisher0-VendorX correspondance
-            # - Group SCCM data by vendor_X, software name, release
+            # - Keep only the vendors which have CPE software data
+            # - List the distinct vendor_X, software name, release tuples
 
             ######
             #   Access SCCM software inventory data
@@ -391,12 +629,12 @@ class MatchSoft(object):
                                 'vendor_X',
                                 'DisplayName0',
                                 'Version0'
-                                ]]
+                                ]].copy()
 
             # and initialize missing release values. NVD CPE uses '-' for
             # missing release data, and so will we.
 
-            df_arSft.loc[df_arSft.Version0.isnull(), 'Version0'] = '-'
+            df_arSft['Version0'] = df_arSft['Version0'].fillna('-')
 
             self.logger.info(
                         '\n\nSCCM Inventory dataframe summary:\n'
@@ -407,15 +645,47 @@ class MatchSoft(object):
                             )
                         )
 
-            # Group SCCM data by vendor_X, software name, release
+            # microsoft will be handled separately as service bulletins, and
+            # some cisco webex products are also hard to match. Drop these
+            # before forming the cartesian product.
+
+            mask_ms = df_arSft['vendor_X'] == 'microsoft'
+            mask_webex = (
+                    (df_arSft['vendor_X'] == 'cisco')
+                    & (df_arSft['Version0'] == '-')
+                    & df_arSft['DisplayName0'].str.lower().str.contains(
+                                                            'webex',
+                                                            na=False
+                                                            )
+                    )
+            df_arSft = df_arSft.loc[~(mask_ms | mask_webex)]
+
+            # Only vendors with CPE software data can be matched
+
+            mask_cpe = df_arSft['vendor_X'].isin(list(dict_cpeSoft))
+            self.logger.info(
+                        '\n\nSCCM software rows without CPE vendor '
+                        'software data: {0}\n\n'.format(
+                            (~mask_cpe).sum()
+                            )
+                        )
+            df_arSft = df_arSft.loc[mask_cpe]
 
-            df_arSft_grp = df_arSft.groupby([
+            # Only the distinct vendor_X, software name, release tuples are
+            # needed for the cartesian product. Get these in sorted order,
+            # the same order as iterating over a groupby on these columns.
+
+            df_arSft_keys = df_arSft.dropna().drop_duplicates().sort_values([
                                     'vendor_X',
                                     'DisplayName0',
                                     'Version0'
                                     ])
 
-            return (df_arSft_grp)
+            return (
+                df_arSft_keys['vendor_X'].values,
+                df_arSft_keys['DisplayName0'].values,
+                df_arSft_keys['Version0'].values
+                )
 
         # Prepare the CPE Software data for ML classification
 
@@ -454,9 +724,45 @@ class MatchSoft(object):
                                     )
                             )
 
-            # Group CPE data by vendor_X
+            # 'normal' CPE release # for matching
+            # but .... java - an exception (as always!)
+            # Normalize the java release data once per distinct CPE name.
 
-            df_cpeSoft_grp = df_cpeSoft.groupby(['vendor_X'])
+            mask_java = (
+                    df_cpeSoft['vendor_X'].isin(['oracle', 'sun'])
+                    & df_cpeSoft['software_X'].isin(['jre', 'jdk'])
+                    )
+            dict_java_rel = dict(
+                    (t_cpe23_name, _fix_java_rel(t_cpe23_name))
+                    for t_cpe23_name in df_cpeSoft.loc[
+                                            mask_java,
+                                            'cpe23-item-name'
+                                            ].unique()
+                    )
+            df_cpeSoft = df_cpeSoft.assign(
+                    relX_match=np.where(
+                            mask_java.values,
+                            df_cpeSoft['cpe23-item-name'].map(
+                                                    dict_java_rel
+                                                    ).values,
+                            df_cpeSoft['release_X'].values
+                            )
+                    )
+
+            # Group CPE data by vendor_X. The columns of each vendor's group
+            # are kept as arrays for fast iteration in the cartesian product:
+            #   vendor_X: (software_X, release_X, release # for matching,
+            #              title_X, @name)
+
+            dict_cpeSoft = {}
+            for (t_cpe_vdr_X, df_cpe_grp) in df_cpeSoft.groupby('vendor_X'):
+                dict_cpeSoft[t_cpe_vdr_X] = (
+                                    df_cpe_grp['software_X'].values,
+                                    df_cpe_grp['release_X'].values,
+                                    df_cpe_grp['relX_match'].values,
+                                    df_cpe_grp['title_X'].values,
+                                    df_cpe_grp['@name'].values
+                                    )
 
             self.logger.info(
                         '\nCPE vendors: \n{0}\n'
@@ -469,7 +775,7 @@ class MatchSoft(object):
                                 )
                         )
 
-            return (df_cpeSoft_grp)
+            return (dict_cpeSoft)
 
         # Form the cartesian product is formed for each Vendor-Publisher
         # tuple:
@@ -480,16 +786,18 @@ class MatchSoft(object):
         # classification.
 
         def _cartesian_product(
-                        df_arSft_grp,
-                        df_cpeSoft_grp
+                        a_ar_vndrX,
+                        a_ar_dsply0,
+                        a_ar_ver0,
+                        dict_cpeSoft
                         ):
 
             # Loop thru the data to find potential matches
 
             self.logger.info('\n\nEntering cartesian_product\n\n')
 
-            # list of product tuples to check
-            lst_dict = []
+            # product tuples to check, accumulated column by column
+            dict_match = dict((col, []) for col in _MATCH_COLS)
 
             t0 = time()
 
@@ -500,144 +808,48 @@ class MatchSoft(object):
                         '*** This can take some time - '
                         'maybe 5 min or more.\n\n'
                         )
-            n = 0
-            m = 0
-            for key, df_ar_grp in df_arSft_grp:
 
-                # split out vendor / SCCM DisplayName0 / SCCM Version0 strings
-                (t_ar_vndrX, t_ar_dsply0, t_ar_ver0) = key
+            # Group the vendor / SCCM DisplayName0 / SCCM Version0 strings
+            # into one block per vendor. The SCCM data is sorted by vendor.
+            lst_blocks = []
+            t_cpe_vdr_X = None
+
+            for (t_ar_vndrX, t_ar_dsply0, t_ar_ver0) in izip(
+                                                        a_ar_vndrX,
+                                                        a_ar_dsply0,
+                                                        a_ar_ver0
+                                                        ):
+
+                # every SCCM vendor has CPE data by construction
+                if t_ar_vndrX != t_cpe_vdr_X:
+                    t_cpe_vdr_X = t_ar_vndrX
+                    lst_blocks.append((
+                                    t_cpe_vdr_X,
+                                    [],
+                                    [],
+                                    dict_cpeSoft[t_cpe_vdr_X]
+                                    ))
+
+                lst_blocks[-1][1].append(t_ar_dsply0)
+                lst_blocks[-1][2].append(t_ar_ver0)
+
+            # Score the vendor blocks in parallel. Results come back in
+            # block order.
+            for dict_vdr_match in utils.parallel_map(
+                                            _score_vendor_sft,
+                                            lst_blocks
+                                            ):
+                for col in _MATCH_COLS:
+                    dict_match[col].extend(dict_vdr_match[col])
 
-                # microsoft will be handled separately as service bulletins
-                if t_ar_vndrX == 'microsoft':
-                    continue
-
-                # some cisco webex products are also hard to match
-                if t_ar_vndrX == 'cisco':
-                    if t_ar_ver0 == '-' and 'webex' in t_ar_dsply0.lower():
-                        continue
-
-                # get the corresponding CPE data for this vendor
-                try:
-                    df_cpe_grp = df_cpeSoft_grp.get_group((t_ar_vndrX))
-
-                except KeyError as e:
-                    self.logger.critical(
-                        '\n\n***matchsft.py cartes product loop -'
-                        ' KeyError: {0}\n\n'.format(e)
-                        )
-                    continue
-
-                for (
-                        t_cpeix,
-                        t_cpe_vdr_X,
-                        t_cpe_sft_X,
-                        t_cpe_relX,
-                        t_cpe_titleX,
-                        t_cpe23_name,
-                        t_cve_name
-                        ) in df_cpe_grp.itertuples():
-
-                    # 'normal' CPE release #
-                    t_cpe_relX_tmp = t_cpe_relX
-
-                    # but .... java - an exception (as always!)
-                    if t_cpe_vdr_X in ['oracle', 'sun']:
-                        if t_cpe_sft_X == 'jre' or t_cpe_sft_X == 'jdk':
-                            t_cpe_relX_tmp = _fix_java_rel(t_cpe23_name)
-
-                    # don't consider vendor name in fuzzy matching
-
-                    t_cpe_titleX_tmp = t_cpe_titleX.lower().replace(
-                                                                t_cpe_vdr_X,
-                                                                ' '
-                                                                )
-                    t_ar_dsply0_tmp = t_ar_dsply0.lower().replace(
-                                                            t_cpe_vdr_X,
-                                                            ' '
-                                                            )
-                    ######
-                    #   Apply quick heuristics to reduce the number of
-                    #   possible matches
-                    ######
-
-                    # 1) Release #'s should at least partially match
-
-                    fz_rel_ratio = fz.ratio(
-                                        t_cpe_relX_tmp,
-                                        t_ar_ver0
-                                        )
-                    fz_rel_ptl_ratio = fz.partial_ratio(
-                                                t_cpe_relX_tmp,
-                                                t_ar_ver0
-                                                )
-
-                    if (t_cpe_relX_tmp != '-') and (t_ar_ver0 != '-'):
-
-                        # If release data is specified, then check that
-                        # there is at least a partial match
-
-                        if fz_rel_ratio < 90 or fz_rel_ptl_ratio < 100:
-                            continue
-
-                    # 2) There should be at least one occurence of one word in
-                    # the cpe full name somewhere in sccm full name
-
-                    fz_ptl_tok_set_ratio = fz.partial_token_set_ratio(
-                                                t_cpe_titleX_tmp,
-                                                t_ar_dsply0_tmp,
-                                                force_ascii=False
-                                                )
-
-                    if fz_ptl_tok_set_ratio < 70:
-                        continue
-
-                    ######
-                    # calculate fuzzy matching statistics for this match
-                    ######
-
-                    lst_dict.append({
-                        'vendor_X': t_cpe_vdr_X,
-                        'software_X': t_cpe_sft_X,
-                        'Version0': t_ar_ver0,
-                        'release_X': t_cpe_relX,
-                        'title_X': t_cpe_titleX,
-                        'DisplayName0': t_ar_dsply0,
-
-                        'fz_ratio': fz.ratio(
-                                        t_cpe_titleX_tmp,
-                                        t_ar_dsply0_tmp
-                                        ),
-                        'fz_ptl_ratio': fz.partial_ratio(
-                                                t_cpe_titleX_tmp,
-                                                t_ar_dsply0_tmp
-                                                ),
-                        'fz_tok_set_ratio': fz_ptl_tok_set_ratio,
-                        'fz_ptl_tok_sort_ratio': fz.token_sort_ratio(
-                                                    t_cpe_titleX_tmp,
-                                                    t_ar_dsply0_tmp,
-                                                    force_ascii=False
-                                                    ),
-                        'fz_uwratio': fz.UWRatio(
-                                        t_cpe_titleX_tmp,
-                                        t_ar_dsply0_tmp
-                                        ),
-
-                        'fz_rel_ratio': fz_rel_ratio,
-                        'fz_rel_ptl_ratio': fz_rel_ptl_ratio,
-                        't_cve_name': t_cve_name
-                        })
-                    m = m+1
-
-                n = n+1
-                if n % 100 < 1:
-                    self.logger.debug(
-                            '---Working ar: '
-                            'sccm sft i/p: {0} '
-                            ', potential matches output: {1}\n'.format(n, m)
-                            )
-                # # debug code to speed thru looping process
-                # if n > 2000:
-                #     break
+            self.logger.debug(
+                    '---Working ar: '
+                    'sccm sft i/p: {0} '
+                    ', potential matches output: {1}\n'.format(
+                                    sum(len(blk[1]) for blk in lst_blocks),
+                                    len(dict_match['t_cve_name'])
+                                    )
+                    )
 
             duration = time() - t0
             self.logger.info(
@@ -646,36 +858,36 @@ class MatchSoft(object):
                                                 )
                         )
 
-            df_match = pd.DataFrame(lst_dict)
+            df_match1 = pd.DataFrame(dict_match, columns=list(_MATCH_COLS))
 
-            if df_match.empty:
+            if df_match1.empty:
                 self.logger.info(
                     '\n\nResulting cartesian product is empty\n\n'
                     )
-                return (df_match)
+                return (df_match1)
 
             else:
-                df_match1 = df_match[[
-                                'vendor_X',
-                                'software_X',
-                                'title_X',
-                                'DisplayName0',
-                                'release_X',
-                                'Version0',
-                                'fz_ratio',
-                                'fz_ptl_ratio',
-                                'fz_tok_set_ratio',
-                                'fz_ptl_tok_sort_ratio',
-                                'fz_uwratio', 'fz_rel_ratio',
-                                'fz_rel_ptl_ratio',
-                                't_cve_name']]
-
                 # add in length of names as features
 
-                df_match1['titlX_len'] = df_match1['title_X'].apply(len)
+                df_match1['titlX_len'] = df_match1['title_X'].str.len()
                 df_match1['DsplyNm0_len'] = df_match1[
                                                     'DisplayName0'
-                                                    ].apply(len)
+                                                    ].str.len()
+
+                # the fuzzy ratios are bounded 0..100: store the ML
+                # features compactly
+                for col in [
+                        'fz_ratio',
+                        'fz_ptl_ratio',
+                        'fz_tok_set_ratio',
+                        'fz_ptl_tok_sort_ratio',
+                        'fz_uwratio',
+                        'fz_rel_ratio',
+                        'fz_rel_ptl_ratio'
+                        ]:
+                    df_match1[col] = df_match1[col].astype(np.int8)
+                for col in ['titlX_len', 'DsplyNm0_len']:
+                    df_match1[col] = df_match1[col].astype(np.int16)
 
                 self.logger.info(
                             '\n\n Results of matching: \n'
@@ -801,10 +1013,11 @@ class MatchSoft(object):
                             )
                     return p_df_match1_test2a
 
-                # Force copy by value
-                df_match1_test2a = p_df_match1_test2a.copy()
+                # The i/p dframe is only read
+                df_match1_test2a = p_df_match1_test2a
 
-                self.logger.debug(
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(
                         '\n\nDframe before removing duplicates '
                         '\n{0}\n{1}\n{2}\n\n'.format(
                             df_match1_test2a.shape,
@@ -820,32 +1033,59 @@ class MatchSoft(object):
 
                 # Pick out the row in group which has maximum fz_uwratio
                 # value. This is likely to be the best match possible.
+                #
+                # Rows with missing keys or fz_uwratio can't be the best
+                # match of a group.
+
+                df_match1_tst2b = df_match1_test2a.dropna(subset=[
+                                                            'vendor_X',
+                                                            'DisplayName0',
+                                                            'Version0',
+                                                            'fz_uwratio'
+                                                            ])
+
+                # Nothing to do if there are no duplicates, as is usual for
+                # the manually labelled data.
+                #
+                # Otherwise, a stable sort by decreasing fz_uwratio puts the
+                # first of the best rows of each group ahead of the rest of
+                # the group. Clean out the rest of the duplicates, and then
+                # restore the original row order.
+
+                if not df_match1_tst2b.duplicated(subset=[
+                                                    u'vendor_X',
+                                                    u'DisplayName0',
+                                                    u'Version0']
+                                                    ).any():
+                    df_match1_tst2c = df_match1_tst2b
 
-                df_match1_tst2a_gp = df_match1_test2a.groupby([
-                                                            "vendor_X",
-                                                            "DisplayName0",
-                                                            "Version0"])
-
-                df_match1_tst2b = df_match1_test2a[
-                                        df_match1_test2a['fz_uwratio']
-                                        == df_match1_tst2a_gp[
-                                                'fz_uwratio'
-                                                ].transform(max)]
-
-                # Clean out the rest of the duplicates for the ML-classified
-                # data
-                df_match1_tst2c = df_match1_tst2b.drop_duplicates(
+                else:
+                    a_order = np.argsort(
+                                    -df_match1_tst2b['fz_uwratio'].values,
+                                    kind='mergesort'
+                                    )
+                    a_dups = df_match1_tst2b.iloc[a_order].duplicated(
                                                         subset=[
                                                             u'vendor_X',
                                                             u'DisplayName0',
                                                             u'Version0']
-                                                            )
+                                                        ).values
+
+                    df_match1_tst2c = df_match1_tst2b.iloc[
+                                                np.sort(a_order[~a_dups])
+                                                ]
 
                 self.logger.info(
                         '\n\nDframe with duplicates removed '
-                        '\n{0}\n{1}\n{2}\n\n'.format(
+                        '\n{0}\n{1}\n\n'.format(
                             df_match1_tst2c.shape,
-                            df_match1_tst2c.columns,
+                            df_match1_tst2c.columns
+                            )
+                        )
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(
+                        '\n\nDistinct values after removing duplicates '
+                        '\n{0}\n\n'.format(
                             df_match1_tst2c.apply(pd.Series.nunique)
                             )
                         )
@@ -857,10 +1097,10 @@ class MatchSoft(object):
 
             self.logger.info('\n\nEntering post_process_matched_data\n\n')
 
-            # Force "call by value"
+            # The i/p dframes are only read
 
-            df_match1_test2 = p_df_match1_test2.copy()
-            labelled_sft_data = p_labelled_sft_data.copy()
+            df_match1_test2 = p_df_match1_test2
+            labelled_sft_data = p_labelled_sft_data
 
             if df_match1_test2.empty:
                 self.logger.critical(
@@ -931,23 +1171,26 @@ class MatchSoft(object):
                                                 )
                         )
 
+        # Prepare CPE vendor / software data for matching
+
+        dict_cpeSoft = _match_prepare_cpe_data(df_cpe4)
+
         # Prepare SCCM software data for matching
 
-        df_arSft_grp = _match_prepare_sccm_data(
+        (a_ar_vndrX, a_ar_dsply0, a_ar_ver0) = _match_prepare_sccm_data(
                                 df_sccm_ar,
-                                df_match_vendor_publisher
+                                df_match_vendor_publisher,
+                                dict_cpeSoft
                                 )
 
-        # Prepare CPE vendor / software data for matching
-
-        df_cpeSoft_grp = _match_prepare_cpe_data(df_cpe4)
-
         # Form cartesian product of CPE vendor/software data with SCCM
         # inventory software data
 
         df_match1 = _cartesian_product(
-                        df_arSft_grp,
-                        df_cpeSoft_grp
+                        a_ar_vndrX,
+                        a_ar_dsply0,
+                        a_ar_ver0,
+                        dict_cpeSoft
                         )
 
         # Update the set of potential match data with known matches
@@ -24,6 +24,7 @@ MatchVendor     Match NVD CPE "Vendor" data to SCCM "Publisher" data
 
 import re
 from time import time
+from itertools import izip
 
 import pandas as pd
 import numpy as np
@@ -31,7 +32,6 @@ import numpy as np
 import sys
 
 from fuzzywuzzy import fuzz as fz
-from sklearn.externals import joblib
 
 import logging
 
@@ -47,6 +47,128 @@ __all__ = (
         )
 
 
+# Fuzzy matching statistics of the vendor cartesian product
+_FZ_COLS = (
+        'fz_ratio',
+        'fz_ptl_ratio',
+        'fz_tok_set_ratio',
+        'fz_ptl_tok_sort_ratio',
+        'fz_uwratio'
+        )
+
+# Number of CPE vendor chunks to score in parallel
+_VENDOR_CHUNKS = 32
+
+
+def _score_vendor_chunk(my_chunk):
+    """Form and score the cartesian product of a chunk of CPE vendors.
+
+    Parameters
+    ----------
+    my_chunk    Tuple of:
+                - array of the indices of the chunk's clean CPE vendor names
+                - array of the chunk's clean CPE vendor names
+                - array of all the clean SCCM publisher names
+                - array of the lengths of the clean SCCM publisher names
+
+    Returns
+    -------
+    (lst_cpe_ix, lst_ar_ix, dict_fz)
+                Three parallel sequences with one entry per potential match:
+
+                lst_cpe_ix  index of the clean CPE vendor name (from the
+                            chunk's index array), in ascending order
+                lst_ar_ix   index of the clean SCCM publisher name, ascending
+                            within each CPE vendor
+                dict_fz     dict of lists of fuzzy ratios keyed by the
+                            _FZ_COLS column names
+
+                The caller extends its own lists with each chunk's results,
+                in chunk order, before building the cartesian product frame.
+
+    """
+    (a_cpe_ix, a_cpeVen, a_arPub0, a_arPub0_len) = my_chunk
+
+    lst_cpe_ix = []
+    lst_ar_ix = []
+    dict_fz = dict((col, []) for col in _FZ_COLS)
+
+    for (t_cpeix, t_cpeVen) in izip(a_cpe_ix, a_cpeVen):
+
+        #   Ignore cpe vendors that are 1 character long (e.g. 'X')
+
+        if (len(t_cpeVen) < 2):
+            logging.getLogger(__name__).debug(
+                                    'cpeVen too short - continuing\n'
+                                    )
+            continue
+
+        # quick heuristics:
+        #   a) 1st word of cpe Vendor string has to be in the
+        #            tokenized wmi Publisher0 string somewhere
+        #   b) condensed cpe name has to be shorter than the full
+        #           WMI 'Publisher0' name
+        #
+        # b) is checked for all publishers at once
+
+        # Several publishers can have the same clean name: score each
+        # clean name only once for this vendor
+        dict_pub_fz = {}
+
+        for t_arix in np.flatnonzero(a_arPub0_len >= len(t_cpeVen)):
+
+            t_arPub0 = a_arPub0[t_arix]
+
+            try:
+                t_fz = dict_pub_fz[t_arPub0]
+
+            except KeyError:
+
+                # Look for at least one occurence of one word in cpeVen
+                #       somewhere in arPub
+                if fz.partial_token_set_ratio(
+                                        t_cpeVen,
+                                        t_arPub0,
+                                        force_ascii=False
+                                        ) < 100:
+                    t_fz = None
+
+                # Calculate fuzzy matching statistics as "features" for
+                # the subsequent ML classification
+
+                else:
+                    t_fz = (
+                        fz.ratio(
+                            t_cpeVen,
+                            t_arPub0),
+                        fz.partial_ratio(
+                            t_cpeVen,
+                            t_arPub0),
+                        fz.token_set_ratio(
+                            t_cpeVen,
+                            t_arPub0,
+                            force_ascii=False),
+                        fz.partial_token_sort_ratio(
+                            t_cpeVen,
+                            t_arPub0,
+                            force_ascii=False),
+                        fz.UWRatio(
+                            t_cpeVen,
+                            t_arPub0)
+                        )
+                dict_pub_fz[t_arPub0] = t_fz
+
+            if t_fz is None:
+                continue
+
+            lst_cpe_ix.append(t_cpeix)
+            lst_ar_ix.append(t_arix)
+            for (col, t_ratio) in izip(_FZ_COLS, t_fz):
+                dict_fz[col].append(t_ratio)
+
+    return (lst_cpe_ix, lst_ar_ix, dict_fz)
+
+
 class MatchVendor(object):
     """Match CPE "Vendor" data to SCCM "Publisher" data.
 
@@ -231,13 +353,15 @@ class MatchVendor(object):
         """
         # Suppress tokens which match "stop" words, e.g. "Inc, Ltd"
 
+        set_stop_wds = frozenset(self.__lst_stop_wds)
+
         def _remove(x):
 
-            result = ' '
-            for str in x:
-                if not(str in self.__lst_stop_wds) and (len(str) > 1):
-                    result = result + ' ' + str
-            return result
+            return ' ' + ''.join(
+                            ' ' + tok
+                            for tok in x
+                            if (len(tok) > 1) and not (tok in set_stop_wds)
+                            )
 
         # Prepare the data for ML Classification
 
@@ -287,12 +411,14 @@ class MatchVendor(object):
             # b) For WMI data, hyphens / ampersands are left "as-is" since
             # these can form part of a vendor name
 
-            df_arPub['pub0_toks'] = df_arPub['publisher0'].str.replace(
-                                        '[_.,()+!]', ' '
-                                        ).str.split()
-            df_cpeVen['vend_toks'] = df_cpeVen['vendor_X'].str.replace(
-                                        '[-_]', ' '
-                                        ).str.split()
+            df_arPub['pub0_toks'] = df_arPub['publisher0'].str.findall(
+                                        r'[^_.,()+!\s]+',
+                                        flags=re.UNICODE
+                                        )
+            df_cpeVen['vend_toks'] = df_cpeVen['vendor_X'].str.findall(
+                                        r'[^-_\s]+',
+                                        flags=re.UNICODE
+                                        )
 
             # Produce new clean names from tokens, taking into account "stop"
             # words
@@ -301,19 +427,21 @@ class MatchVendor(object):
             df_cpeVen['ven_cln'] = df_cpeVen['vend_toks'].apply(_remove)
 
             # show results of tokenization
-            self.logger.info(
-                '\n\nSample CPE vendors \n{0}\n\n'.format(
-                    df_cpeVen[['vendor_X', 'vend_toks', 'ven_cln']].sample(10)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    '\n\nSample CPE vendors \n{0}\n\n'.format(
+                        df_cpeVen[
+                            ['vendor_X', 'vend_toks', 'ven_cln']].sample(10)
+                        )
                     )
-                )
 
-            self.logger.info(
-                '\n\nSample SCCM publishers \n'
-                '{0}\n\n'.format(
-                    df_arPub[
-                        ['publisher0', 'pub0_toks', 'pub0_cln']].sample(10)
+                self.logger.debug(
+                    '\n\nSample SCCM publishers \n'
+                    '{0}\n\n'.format(
+                        df_arPub[
+                            ['publisher0', 'pub0_toks', 'pub0_cln']].sample(10)
+                        )
                     )
-                )
 
             return (df_arPub, df_cpeVen)
 
@@ -323,14 +451,16 @@ class MatchVendor(object):
 
             self.logger.info('\n\nEntering cartesian_product\n\n')
 
-            # Force copy-by-value
-            df_arPub = p_df_arPub.copy()
-            df_cpeVen = p_df_cpeVen.copy()
+            # The i/p dframes are only read
+            df_arPub = p_df_arPub
+            df_cpeVen = p_df_cpeVen
 
-            # List of name tuples to check
-            lst_dict = []
+            # Name tuples to check: indices of the CPE vendor / SCCM publisher
+            # names, and their statistics accumulated column by column
+            lst_cpe_ix = []
+            lst_ar_ix = []
+            dict_fz = dict((col, []) for col in _FZ_COLS)
             t0 = time()
-            mycount = 0
             self.logger.info(
                             '\n\nStarting generation of '
                             'cartesian product of NIST vendors '
@@ -340,88 +470,47 @@ class MatchVendor(object):
                             )
 
             # Build the the cartisan product of the two sets of names (CPE,
-            # SCCM/WMI) by iterating through the input dataframes
-
-            for (
-                    t_cpeix,
-                    t_cpeVen_orig,
-                    t_cpevend_toks,
-                    t_cpeVen
-                    ) in df_cpeVen.itertuples():
-
-                #   Ignore cpe vendors that are 1 character long (e.g. 'X')
-
-                if (len(t_cpeVen) < 2):
-                    self.logger.debug('cpeVen too short - continuing\n')
-                    continue
-
-                for (
-                        t_arix,
-                        t_arPub0_orig,
-                        t_arpub_toks,
-                        t_arPub0
-                        ) in df_arPub.itertuples():
-
-                    # quick heuristics:
-                    #   a) 1st word of cpe Vendor string has to be in the
-                    #            tokenized wmi Publisher0 string somewhere
-                    #   b) condensed cpe name has to be shorter than the full
-                    #           WMI 'Publisher0' name
-
-                    if len(t_cpeVen) > len(t_arPub0):
-                        # self.logger.debug('arPub0 too short - continuing'
-                        continue
-
-                    # Look for at least one occurence of one word in cpeVen
-                    #       somewhere in arPub
-                    if fz.partial_token_set_ratio(
-                                            t_cpeVen,
-                                            t_arPub0,
-                                            force_ascii=False
-                                            ) < 100:
-                        continue
-
-                    # Calculate fuzzy matching statistics as "features" for
-                    # the subsequent ML classification
-
-                    lst_dict.append({
-                        'publisher0': t_arPub0_orig,
-                        'pub0_cln': t_arPub0,
-                        'vendor_X': t_cpeVen_orig,
-                        'ven_cln': t_cpeVen,
-                        'fz_ratio': fz.ratio(
-                                t_cpeVen,
-                                t_arPub0),
-                        'fz_ptl_ratio': fz.partial_ratio(
-                                t_cpeVen,
-                                t_arPub0),
-                        'fz_tok_set_ratio': fz.token_set_ratio(
-                                t_cpeVen,
-                                t_arPub0,
-                                force_ascii=False),
-                        'fz_ptl_tok_sort_ratio': fz.partial_token_sort_ratio(
-                                    t_cpeVen,
-                                    t_arPub0,
-                                    force_ascii=False),
-                        'fz_uwratio': fz.UWRatio(
-                                t_cpeVen,
-                                t_arPub0)
-                        })
-                    mycount = mycount + 1
-                    if mycount % 1000 == 0:
-                        self.logger.debug(
-                                    '# entries produced: {0}\n'.format(
-                                                mycount
+            # SCCM/WMI) by iterating through arrays of the input names.
+            #
+            # Different CPE vendors can have the same clean name, so only
+            # the distinct clean names are scored. These are split into
+            # chunks which are scored in parallel. Results come back in
+            # chunk order.
+
+            a_cpeVen_orig = df_cpeVen['vendor_X'].values
+            a_cpeVen = df_cpeVen['ven_cln'].values
+            a_arPub0_orig = df_arPub['publisher0'].values
+            a_arPub0 = df_arPub['pub0_cln'].values
+            a_arPub0_len = df_arPub['pub0_cln'].str.len().values
+
+            (a_cpeVen_u, a_cpeVen_inv) = np.unique(
+                                                a_cpeVen,
+                                                return_inverse=True
                                                 )
-                                     )
 
-                #     # debug code to shorten loop for testing
-                #     if mycount > 1000:
-                #         break
+            lst_chunks = [
+                    (a_u_ix, a_cpeVen_u[a_u_ix], a_arPub0, a_arPub0_len)
+                    for a_u_ix in np.array_split(
+                                np.arange(len(a_cpeVen_u)),
+                                max(1, min(_VENDOR_CHUNKS, len(a_cpeVen_u)))
+                                )
+                    ]
+
+            for (
+                    lst_chunk_cpe_ix,
+                    lst_chunk_ar_ix,
+                    dict_chunk_fz
+                    ) in utils.parallel_map(_score_vendor_chunk, lst_chunks):
+                lst_cpe_ix.extend(lst_chunk_cpe_ix)
+                lst_ar_ix.extend(lst_chunk_ar_ix)
+                for col in _FZ_COLS:
+                    dict_fz[col].extend(dict_chunk_fz[col])
 
-                # # debug code to speed thru loops
-                # if mycount > 1000:
-                #     break
+            self.logger.debug(
+                        '# entries produced: {0}\n'.format(
+                                    len(lst_cpe_ix)
+                                    )
+                         )
 
             duration = time() - t0
             self.logger.info(
@@ -429,7 +518,39 @@ class MatchVendor(object):
                             duration
                             )
                     )
-            df_match = pd.DataFrame(lst_dict)
+
+            # The fuzzy ratios are bounded 0..100
+            for col in _FZ_COLS:
+                dict_fz[col] = np.array(dict_fz[col], dtype=np.uint8)
+
+            # Expand the matches of each distinct clean name back to the
+            # CPE vendors with that name, in CPE vendor order. The matches
+            # are sorted by clean name index.
+            a_u_ix = np.array(lst_cpe_ix, dtype=np.intp)
+            a_u_start = np.searchsorted(a_u_ix, a_cpeVen_inv, side='left')
+            a_u_end = np.searchsorted(a_u_ix, a_cpeVen_inv, side='right')
+
+            a_rows = np.concatenate([np.zeros(0, dtype=np.intp)] + [
+                            np.arange(t_start, t_end, dtype=np.intp)
+                            for (t_start, t_end) in izip(a_u_start, a_u_end)
+                            ])
+
+            for col in _FZ_COLS:
+                dict_fz[col] = dict_fz[col][a_rows]
+
+            # Pick out the names of the matched tuples in one shot
+            a_cpe_ix = np.repeat(
+                            np.arange(len(a_cpeVen), dtype=np.intp),
+                            a_u_end - a_u_start
+                            )
+            a_ar_ix = np.array(lst_ar_ix, dtype=np.intp)[a_rows]
+
+            dict_fz['publisher0'] = a_arPub0_orig[a_ar_ix]
+            dict_fz['pub0_cln'] = a_arPub0[a_ar_ix]
+            dict_fz['vendor_X'] = a_cpeVen_orig[a_cpe_ix]
+            dict_fz['ven_cln'] = a_cpeVen[a_cpe_ix]
+
+            df_match = pd.DataFrame(dict_fz)
 
             if df_match.empty:
                 self.logger.info(
@@ -454,11 +575,17 @@ class MatchVendor(object):
 
             self.logger.info('\n\nEntering update_with_labelled_data\n\n')
 
-            df_match = p_df_match.copy()
+            # The cartesian product dframe is not used elsewhere, so the
+            # features are added to it in place
+            df_match = p_df_match
 
             # add in length of names as features
-            df_match['ven_len'] = df_match['vendor_X'].apply(len)
-            df_match['pu0_len'] = df_match['publisher0'].apply(len)
+            df_match['ven_len'] = df_match['vendor_X'].str.len().astype(
+                                                                np.int32
+                                                                )
+            df_match['pu0_len'] = df_match['publisher0'].str.len().astype(
+                                                                np.int32
+                                                                )
 
             # Read in the data that was manually labelled in order to
             # originally train the ML model.
@@ -519,9 +646,9 @@ class MatchVendor(object):
 
             self.logger.info('\n\nEntering post_process_matched_data\n\n')
 
-            # Force call-by-value
-            df_match_test2 = p_df_match_test2.copy()
-            df_match_lbl = p_df_match_lbl.copy()
+            # The i/p dframes are only read
+            df_match_test2 = p_df_match_test2
+            df_match_lbl = p_df_match_lbl
 
             df_match_consol1 = self.__ML.post_process_matched_data(
                                         df_match_test2,
@@ -540,7 +667,8 @@ class MatchVendor(object):
                     )
                 )
 
-            self.logger.debug(
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
                             '\n\nSample matches: \n{0}\n\n'.format(
                                     self.df_match_vendor_publisher.sample(20)
                                     )
@@ -37,6 +37,8 @@ The following restrictions should be clearly understood and respected.
 *  Labelled data always has a "match" attribute field.
 """
 
+import os
+
 import pandas as pd
 import numpy as np
 
@@ -53,6 +55,45 @@ __all__ = (
         'MLClassify'
         )
 
+# Number of rows classified per call to the Random Forest predict
+_PREDICT_CHUNK = 65536
+
+# Loaded ML models: model file name -> (modification time, model object)
+_model_cache = {}
+
+
+def _load_model(my_file):
+    """Load a serialized ML model.
+
+    The model is reused as long as the file is not modified.
+    """
+    try:
+        my_mtime = os.path.getmtime(my_file)
+    except OSError:
+        my_mtime = None
+
+    my_cached = _model_cache.get(my_file)
+    if (my_cached is not None and
+            my_mtime is not None and
+            my_cached[0] == my_mtime):
+        return my_cached[1]
+
+    my_clf = joblib.load(my_file)
+
+    _model_cache[my_file] = (my_mtime, my_clf)
+    return my_clf
+
+
+class _LazyStr(object):
+    """Defer an expensive log argument until the message is emitted."""
+
+    def __init__(self, my_func, *my_args):
+        self._func = my_func
+        self._args = my_args
+
+    def __str__(self):
+        return str(self._func(*self._args))
+
 
 class MLClassify(object):
     """Match NVD CPE "Software" data to SCCM "Software" inventory data.
@@ -153,17 +194,17 @@ class MLClassify(object):
 
         if (type_data == 'vendor'):
 
-            self._key_list = gbls.vendor_key_list
-            self._feature_list = gbls.vendor_feature_list
-            self._attr_list = gbls.vendor_attr_list
+            self._key_list = list(gbls.vendor_key_list)
+            self._feature_list = list(gbls.vendor_feature_list)
+            self._attr_list = list(gbls.vendor_attr_list)
 
             model = gbls.clf_vendor
 
         elif (type_data == 'software'):
 
-            self._key_list = gbls.sft_key_list
-            self._feature_list = gbls.sft_feature_list
-            self._attr_list = gbls.sft_attr_list
+            self._key_list = list(gbls.sft_key_list)
+            self._feature_list = list(gbls.sft_feature_list)
+            self._attr_list = list(gbls.sft_attr_list)
 
             model = gbls.clf_software
 
@@ -176,7 +217,11 @@ class MLClassify(object):
         # Input the serialized ML model
 
         try:
-            self.__clf = joblib.load(model)
+            self.__clf = _load_model(model)
+
+            # The model keeps the n_jobs it was trained with. Predict on the
+            # trees in parallel.
+            self.__clf.n_jobs = gbls.rf_n_jobs
 
         except IOError as e:
             self.logger.critical(
@@ -210,9 +255,11 @@ class MLClassify(object):
         """
         self.logger.info('\n\nEntering upd_using_labelled_data\n\n')
 
-        # force call-by-value
-        df_match = p_df_match.copy()
-        df_match_lbl = p_df_match_lbl.copy()
+        # force call-by-value. The data itself is not modified in place, so a
+        # shallow copy is enough. The labelled data is only read through the
+        # column projection below, which is a new frame.
+        df_match = p_df_match.copy(deep=False)
+        df_match_lbl = p_df_match_lbl
 
         if df_match_lbl.empty:
             self.logger.info('Input dataframe df_match_lbl is empty.')
@@ -223,13 +270,21 @@ class MLClassify(object):
             return (df_match)
 
         self.logger.info(
-                'Data set to be classified: {0}\n{1}\n{2}\n\n'
-                'Labelled data: \n{3}\n{4}\n{5}\n\n'.format(
+                'Data set to be classified: {0}\n{1}\n\n'
+                'Labelled data: \n{2}\n{3}\n\n'.format(
                                     df_match.shape,
                                     df_match.columns,
-                                    df_match.apply(pd.Series.nunique),
                                     df_match_lbl.shape,
-                                    df_match_lbl.columns,
+                                    df_match_lbl.columns
+                                    )
+                )
+
+        # Counting distinct values scans every column: only do it for debug
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                'Distinct values: \nData set to be classified: \n{0}\n\n'
+                'Labelled data: \n{1}\n\n'.format(
+                                    df_match.apply(pd.Series.nunique),
                                     df_match_lbl.apply(pd.Series.nunique)
                                     )
                 )
@@ -263,7 +318,8 @@ class MLClassify(object):
                                 )
 
         # check that only Match values changed
-        self.logger.debug(
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
                     '\n\nCheck that updating with the labelled '
                     'data did not add extra null records.\n'
                     '--Updated data set to be classified:'
@@ -272,7 +328,7 @@ class MLClassify(object):
                             df_match_upd.columns,
                             df_match_upd.apply(pd.Series.nunique)
                             )
-            )
+                )
 
         return (df_match_upd)
 
@@ -297,8 +353,9 @@ class MLClassify(object):
         Dataframe containing manually labelled data
 
         """
-        # Force call by value
-        df_match_upd = p_df_match_upd.copy()
+        # Force call by value. The data itself is not modified in place, so a
+        # shallow copy is enough.
+        df_match_upd = p_df_match_upd.copy(deep=False)
 
         # Do ML classification
         self.logger.info('\n\nEntering ml_classify\n\n')
@@ -310,10 +367,9 @@ class MLClassify(object):
             return(df_match_upd, df_match_upd)
 
         # Separate out the test data (i.e. not yet classified)
-        df_match_test = df_match_upd[df_match_upd['match'].isnull()]
-        df_match_labelled = df_match_upd[
-                                df_match_upd['match'].notnull()
-                                ]
+        mask_test = df_match_upd['match'].isnull().values
+        df_match_test = df_match_upd[mask_test]
+        df_match_labelled = df_match_upd[~mask_test]
 
         if df_match_test.empty:
             df_match_test2 = df_match_test.reset_index(drop=True)
@@ -325,16 +381,43 @@ class MLClassify(object):
                 '\nStarting ML matching\n\n'
                 )
 
-            # Format the test data feature set.
-            df_match_test1 = df_match_test[['match'] + self._feature_list]
+            # Format the test data feature set as a numpy array for input to
+            # the ML algorithm. The trees work on float32 data, so convert
+            # once here rather than inside predict.
+            Xt = df_match_test[self._feature_list].values.astype(np.float32)
+
+            # Many test rows have the same features: classify each distinct
+            # feature row only once. np.unique has no axis argument in
+            # numpy 1.12, so the rows are compared as raw bytes.
+            Xt = np.ascontiguousarray(Xt)
+            (a_uniq_ix, a_uniq_inv) = np.unique(
+                        Xt.view(np.dtype(
+                                (np.void, Xt.dtype.itemsize * Xt.shape[1])
+                                )).ravel(),
+                        return_index=True,
+                        return_inverse=True
+                        )[1:]
+            Xt_uniq = Xt[a_uniq_ix]
+
+            # Classify in chunks of rows to bound the memory used by predict
+            a_match_uniq = np.empty(
+                            Xt_uniq.shape[0],
+                            dtype=self.__clf.classes_.dtype
+                            )
+            for i in range(0, Xt_uniq.shape[0], _PREDICT_CHUNK):
+                a_match_uniq[i:i + _PREDICT_CHUNK] = self.__clf.predict(
+                                                Xt_uniq[i:i + _PREDICT_CHUNK]
+                                                )
 
-            # Convert to a numpy array for input to the ML algorithm
-            np_match_test1 = np.asarray(df_match_test1)
-            Xt = np_match_test1[:, 1:]
+            self.logger.debug(
+                '\nDistinct feature rows classified: {0} of {1}\n'.format(
+                                                    Xt_uniq.shape[0],
+                                                    Xt.shape[0]
+                                                    )
+                )
 
-            s_match_test = pd.Series(self.__clf.predict(Xt))
             df_match_test2 = df_match_test.reset_index(drop=True)
-            df_match_test2['match'] = s_match_test
+            df_match_test2['match'] = a_match_uniq[a_uniq_inv]
 
             # Most, if not all, test data pairs will be rejected
             # since the labelling effort was quite comprehensive
@@ -342,29 +425,36 @@ class MLClassify(object):
             self.logger.info(
                 '\n\nResults of ML '
                 'classification: \n\n'
-                'Test data: {0}\n{1}\n '
-                'Labelled data: {2}\n{3}\n '
-                'Match counts: {4}\n'.format(
-                    df_match_test2.shape,
-                    df_match_test2.columns,
-                    df_match_labelled.shape,
-                    df_match_labelled.columns,
-                    df_match_test2['match'].value_counts()
-                    )
+                'Test data: %s\n%s\n '
+                'Labelled data: %s\n%s\n '
+                'Match counts: %s\n',
+                df_match_test2.shape,
+                df_match_test2.columns,
+                df_match_labelled.shape,
+                df_match_labelled.columns,
+                _LazyStr(df_match_test2['match'].value_counts)
                 )
 
+            a_pos_ix = np.flatnonzero(
+                            (df_match_test2.match == 1).values
+                            )
             sample_size = min(
-                            (df_match_test2.match == 1).sum(),
+                            a_pos_ix.size,
                             10
                             )
 
             if sample_size > 0:
                 self.logger.info(
-                        '\nSample matches: \n{0}\n\n'.format(
-                        df_match_test2[
-                                df_match_test2.match == 1
-                                ].sample(sample_size)
-                        )
+                        '\nSample matches: \n%s\n\n',
+                        _LazyStr(
+                            lambda: df_match_test2.iloc[
+                                np.random.choice(
+                                    a_pos_ix,
+                                    size=sample_size,
+                                    replace=False
+                                    )
+                                ]
+                            )
                     )
             else:
                 self.logger.info(
@@ -397,9 +487,10 @@ class MLClassify(object):
         and labelled data
 
         """
-        # Force call-by-value
-        df_match_test2 = p_df_match_test2.copy()
-        df_match_lbl = p_df_match_lbl.copy()
+        # Force call-by-value. The data itself is not modified in place, so a
+        # shallow copy is enough.
+        df_match_test2 = p_df_match_test2.copy(deep=False)
+        df_match_lbl = p_df_match_lbl.copy(deep=False)
 
         # concatenate the two sets of classified data: the manual set, and
         # the machine-classified one
@@ -419,38 +510,57 @@ class MLClassify(object):
             return (df_match_lbl)
 
         self.logger.info(
-            'ML-matched data: {0}\n{1}\n{2}\n'
-            'Labelled data: {3}\n{4}\n{5}\n\n'.format(
+            'ML-matched data: {0}\n{1}\n'
+            'Labelled data: {2}\n{3}\n\n'.format(
                                 df_match_test2.shape,
                                 df_match_test2.columns,
-                                df_match_test2.apply(pd.Series.nunique),
                                 df_match_lbl.shape,
-                                df_match_lbl.columns,
-                                df_match_lbl.apply(pd.Series.nunique)
+                                df_match_lbl.columns
                                 )
             )
 
-        df_match_consol1 = pd.concat([
-                                df_match_test2[
-                                    df_match_test2['match'].notnull()
-                                    ],
-                                df_match_lbl
-                                ],
-                                ignore_index=True
+        # Counting distinct values scans every column: only do it for debug
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                'Distinct values: \nML-matched data: \n{0}\n'
+                'Labelled data: \n{1}\n\n'.format(
+                                df_match_test2.apply(pd.Series.nunique),
+                                df_match_lbl.apply(pd.Series.nunique)
                                 )
+                )
+
+        df_match_test3 = df_match_test2[df_match_test2['match'].notnull()]
+
+        # No need to concatenate if the classified data has no matches
+        if df_match_test3.empty:
+            df_match_consol1 = df_match_lbl.reset_index(drop=True)
+        else:
+            df_match_consol1 = pd.concat([
+                                    df_match_test3,
+                                    df_match_lbl
+                                    ],
+                                    ignore_index=True,
+                                    copy=False
+                                    )
 
         # eliminate any possible remaining duplicate records
         df_match_consol = df_match_consol1.drop_duplicates(self._key_list)
 
         self.logger.info(
             '\nConsolidated Matched dataframe: '
-            '\n{0}\n{1}\n{2}\n{3}\n\n'.format(
-                    df_match_consol.shape,
-                    df_match_consol.columns,
-                    df_match_consol['match'].value_counts(),
+            '\n%s\n%s\n%s\n\n',
+            df_match_consol.shape,
+            df_match_consol.columns,
+            _LazyStr(df_match_consol['match'].value_counts)
+            )
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                '\nConsolidated Matched dataframe distinct values: '
+                '\n{0}\n\n'.format(
                     df_match_consol.apply(pd.Series.nunique)
                     )
-            )
+                )
 
         # Only interested in +ve matches
         df_match_consol1 = df_match_consol[
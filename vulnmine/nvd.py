@@ -26,12 +26,14 @@ NvdCve          NVD CVE vulnerability data
 
 """
 import re
+from collections import OrderedDict
 
 import pandas as pd
 import sys
 import datetime
 import time
 import os
+from multiprocessing.pool import ThreadPool
 
 import requests
 import xmltodict as xd
@@ -46,6 +48,62 @@ __all__ = (
         'NvdCve'
         )
 
+# Name prefixes of CPE 2.3 'OS' and 'Hardware' entries
+_CPE23_OS_HW_PREFIXES = ['cpe:2.3:o:', 'cpe:2.3:h:']
+
+# Vendor, software, release fields of a CPE 2.3 application name
+_CPE23_APP_PATTERN = re.compile(
+            '^cpe:2.3:a:'
+            '(?P<vendor_X>[^:]*):'
+            '(?P<software_X>[^:]*):'
+            '?(?P<release_X>[^:]*):',
+            re.IGNORECASE | re.UNICODE)
+
+
+def _parse_xml_items(my_file, item_tag):
+    """Stream the second level XML items of a file into a list of dicts.
+
+    xmltodict hands over each item as soon as it has been parsed, so neither
+    the raw file contents nor the dict for the whole document are held in
+    memory. The item dicts have the same layout as for a full parse.
+    """
+    lst_items = []
+
+    def myfn_item(path, item):
+        (name, attrs) = path[-1]
+        if name == item_tag:
+            # Item attributes are only passed in the path
+            my_item = OrderedDict(
+                        ('@' + key, value)
+                        for (key, value) in (attrs or {}).items()
+                        )
+            if isinstance(item, dict):
+                my_item.update(item)
+            lst_items.append(my_item)
+        return True
+
+    with open(my_file) as fd:
+        xd.parse(fd, item_depth=2, item_callback=myfn_item)
+
+    return lst_items
+
+
+def _parse_cve_file(my_file):
+    """Parse one yearly CVE XML file into a dataframe.
+
+    This runs in the worker processes of utils.parallel_map. None is returned
+    if the file cannot be read.
+    """
+    try:
+        return pd.DataFrame.from_dict(
+                    _parse_xml_items(my_file, 'entry')
+                    )
+    except IOError as e:
+        logging.getLogger(__name__).critical(
+                '\n\n***I/O error({0}): {1}\n\n'.format(
+                    e.errno, e.strerror))
+        return None
+
 
 class NvdCpe(object):
     """Input, parse, persist NIST NVD vendor/software data.
@@ -208,11 +266,7 @@ class NvdCpe(object):
             self.logger.info(
                 '\nDo CPE download\n\n')
 
-            (cpe_filename, cpe_filecontents) = utils.get_zip(gbls.url_cpe)
-            if cpe_filename:
-                output_cpe = open(my_cpe, 'w')
-                output_cpe.write(cpe_filecontents)
-                output_cpe.close()
+            utils.get_zip_to(gbls.url_cpe, my_cpe)
 
         return None
 
@@ -225,8 +279,8 @@ class NvdCpe(object):
         The NVD CPE XML flat file is read. This file documents vendors and
         corresponding published software in a formal, standardized format.
 
-        * The XML file is parsed into a python dictionary. This in turn is
-          loaded into a pandas dataframe.
+        * The XML file is parsed item by item into python dictionaries.
+          These in turn are loaded into a pandas dataframe.
 
         * The data is cleaned by removing deprecated entries along with
         accompanying columns.
@@ -271,12 +325,9 @@ class NvdCpe(object):
                     )
                 )
 
-        with open(my_cpe) as fd:
-            dict_cpe = xd.parse(fd.read())
-
-        # convert the python dictionary to a pandas dataframe
+        # convert the parsed cpe items to a pandas dataframe
         df_cpe = pd.DataFrame.from_dict(
-                    dict_cpe['cpe-list']['cpe-item']
+                    _parse_xml_items(my_cpe, 'cpe-item')
                     )
 
         self.logger.debug(
@@ -331,10 +382,11 @@ class NvdCpe(object):
 
         # Remove entries pertaining to 'OS' and 'Hardware'
         # look at applications only. Eliminate 'h' (hardware), 'o' OS
-        pattern = re.compile('cpe:2.3:[oh]:', re.IGNORECASE | re.UNICODE)
+        # The part is at a fixed offset so compare the name prefix directly
+        s_cpe_prefix = df_cpe2['cpe23-item-name'].str.slice(0, 10).str.lower()
 
         df_cpe3 = df_cpe2[
-                ~(df_cpe2['cpe23-item-name'].str.contains(pattern))
+                ~(s_cpe_prefix.isin(_CPE23_OS_HW_PREFIXES))
                 ]
 
         self.logger.info(
@@ -359,19 +411,14 @@ class NvdCpe(object):
             else:
                 return row['#text']
 
-        df_cpe3['title_X'] = s_cpe_title_dict.apply(myfn4)
+        df_cpe3['title_X'] = [
+                    myfn4(row) for row in s_cpe_title_dict.values
+                    ]
 
         # Extract vendor, software, release information
 
-        pattern = re.compile(
-            'cpe:2.3:a:'
-            '(?P<vendor_X>[^:]*):'
-            '(?P<software_X>[^:]*):'
-            '?(?P<release_X>[^:]*):',
-            re.IGNORECASE | re.UNICODE)
-
         df_tmp = df_cpe3['cpe23-item-name'].str.extract(
-                                    pattern,
+                                    _CPE23_APP_PATTERN,
                                     expand=False)
 
         # add the new columns to the main dataframe
@@ -418,9 +465,17 @@ class NvdCpe(object):
         self.df_cpe4.to_pickle(gbls.df_cpe4_pck)
         return None
 
-    def get(self):
-        """Return a *copy* of the dataframe."""
-        df_tmp = self.df_cpe4.copy()
+    def get(self, copy=True):
+        """Return a *copy* of the dataframe.
+
+        copy=False returns the dataframe itself, for callers which only read
+        it.
+
+        """
+        if copy:
+            df_tmp = self.df_cpe4.copy()
+        else:
+            df_tmp = self.df_cpe4
         self.logger.info(
                 '\n\nGet NvdCpe.df_cpe4: \n{0}\n{1}\n\n'.format(
                                 df_tmp.shape,
@@ -614,7 +669,8 @@ class NvdCve(object):
             Determine current year. Allocate download directory if it does not
             exist.
 
-            For each year to be processed:
+            For each year to be processed (the years are downloaded in
+            parallel by a pool of threads sharing one http session):
 
                 Download that year's meta file.
 
@@ -624,7 +680,7 @@ class NvdCve(object):
                 If meta file contents have changed, then download the updated
                 XML Feed file.
 
-                The XML file is unzipped and stored in the download directory.
+                The XML file is unzipped straight to the download directory.
 
         Exceptions
         ----------
@@ -641,10 +697,8 @@ class NvdCve(object):
         now = datetime.datetime.now()
         my_yr = now.year
 
-        # Process cve files for last "n" years
-
-        for index in range(gbls.num_nvd_files):
-            yr_processed = my_yr - index
+        def myfn_fetch(yr_processed):
+            # Download the meta file and, if changed, the XML feed for 1 yr
             self.logger.info(
                 '\n\nProcessing NVD files for {0}\n'.format(yr_processed)
                 )
@@ -661,7 +715,7 @@ class NvdCve(object):
                                 )
                 )
             try:
-                resp = requests.get(url_meta)
+                resp = my_session.get(url_meta)
 
             except requests.exceptions.RequestException as e:
                     self.logger.critical(
@@ -671,7 +725,7 @@ class NvdCve(object):
                             e
                             )
                         )
-                    continue
+                    return None
 
             meta_filename = (
                             gbls.nvddir
@@ -693,7 +747,7 @@ class NvdCve(object):
                                                     meta_filename
                                                     )
                         )
-                    continue
+                    return None
                 else:
                     self.logger.debug(
                         '\nMeta files differ:\n'
@@ -723,31 +777,59 @@ class NvdCve(object):
                         + gbls.url_xml_end
                         )
 
-            (xml_filename, xml_filecontents) = utils.get_zip(url_xml)
-
-            # write this new / updated xml feed file to disk as well
+            # hardcode the filenames to avoid problems if NIST changes
+            # names
 
-            if xml_filename:
+            my_cve_filename = (
+                        gbls.nvdcve
+                        + str(yr_processed)
+                        + '.xml'
+                        )
 
-                # hardcode the filenames to avoid problems if NIST changes
-                # names
+            # write this new / updated xml feed file straight to disk
 
-                my_cve_filename = (
-                            gbls.nvdcve
-                            + str(yr_processed)
-                            + '.xml'
-                            )
+            xml_filename = utils.get_zip_to(
+                                    url_xml,
+                                    my_cve_filename,
+                                    my_session
+                                    )
 
+            if xml_filename:
                 self.logger.info(
-                    '\nSaving XML file I/P {0} as {1}\n\n'.format(
+                    '\nSaved XML file I/P {0} as {1}\n\n'.format(
                                                 xml_filename,
                                                 my_cve_filename
                                                 )
                     )
 
-                output_xml = open(my_cve_filename, 'wb')
-                output_xml.write(xml_filecontents)
-                output_xml.close()
+            return None
+
+        # Process cve files for last "n" years. The downloads are I/O bound
+        # so run them in a pool of threads sharing one http session.
+
+        lst_yrs = [my_yr - index for index in range(gbls.num_nvd_files)]
+        num_threads = min(gbls.nvd_download_threads, len(lst_yrs))
+
+        my_session = requests.Session()
+        my_adapter = requests.adapters.HTTPAdapter(
+                                    pool_connections=max(num_threads, 1),
+                                    pool_maxsize=max(num_threads, 1)
+                                    )
+        my_session.mount('https://', my_adapter)
+        my_session.mount('http://', my_adapter)
+
+        try:
+            if num_threads < 2:
+                map(myfn_fetch, lst_yrs)
+            else:
+                my_pool = ThreadPool(processes=num_threads)
+                try:
+                    my_pool.map(myfn_fetch, lst_yrs)
+                finally:
+                    my_pool.close()
+                    my_pool.join()
+        finally:
+            my_session.close()
 
         return None
 
@@ -767,9 +849,10 @@ class NvdCve(object):
           was discovered.
 
           Each files is read, parsed into a python dictionary, then converted
-          to a pandas dataframe.
+          to a pandas dataframe. The files are parsed in parallel worker
+          processes.
 
-          All of these individual data frames are appended to form one
+          All of these individual data frames are concatenated to form one
           dataframe.
 
         * The data is cleaned by eliminating null entries.
@@ -799,7 +882,8 @@ class NvdCve(object):
 
         # Read in the uncompressed NVD XML data
         try:
-            fst_time = True
+            lst_nvd = []
+            lst_files = []
 
             if my_dir is None:
                 my_dir = gbls.nvddir
@@ -829,17 +913,17 @@ class NvdCve(object):
                             )
                         )
 
-                with open(my_file1) as fd:
-                    my_dict = xd.parse(fd.read())
+                lst_files.append(my_file1)
 
-                df_tmp = pd.DataFrame.from_dict(
-                            my_dict['nvd']['entry']
-                            )
-                if fst_time:
-                    df_nvd = df_tmp
-                    fst_time = False
-                else:
-                    df_nvd = df_nvd.append(df_tmp)
+            # The yearly files are independent: parse them in parallel
+            lst_nvd = [
+                    df_tmp
+                    for df_tmp in utils.parallel_map(
+                                                _parse_cve_file,
+                                                lst_files
+                                                )
+                    if df_tmp is not None
+                    ]
 
         except IOError as e:
             self.logger.critical('\n\n***I/O error({0}): {1}\n\n'.format(
@@ -850,6 +934,9 @@ class NvdCve(object):
                     sys.exc_info()[0]))
             raise
 
+        # Concatenate the yearly dataframes in one pass
+        df_nvd = pd.concat(lst_nvd, ignore_index=True, copy=False)
+
         self.logger.info(
             '\n\nNVD CVE raw data input counts: \n{0}\n{1}\n\n'.format(
                     df_nvd.shape,
@@ -1013,9 +1100,17 @@ class NvdCve(object):
         self.df_cve.to_pickle(gbls.df_cve_pck)
         return None
 
-    def get(self):
-        """Return a *copy* of the data."""
-        df_tmp = self.df_cve.copy()
+    def get(self, copy=True):
+        """Return a *copy* of the data.
+
+        copy=False returns the dataframe itself, for callers which only read
+        it.
+
+        """
+        if copy:
+            df_tmp = self.df_cve.copy()
+        else:
+            df_tmp = self.df_cve
         self.logger.info(
                 '\n\nGet NvdCve.df_cve: \n{0}\n{1}\n\n'.format(
                                 df_tmp.shape,
@@ -1,4 +1,5 @@
 import sys
+import os
 import pandas as pd
 import re
 from yapsy.IPlugin import IPlugin
@@ -35,6 +36,42 @@ else:
     import vulnmine.gbls as gbls
 
 
+# Parsed AD VIP group data, keyed by filename: (file mtime, dframe)
+_ad_vip_cache = {}
+
+
+def _read_ad_vip_grps(my_file):
+    """Read the AD VIP group CSV file.
+
+    The parsed dframe is reused as long as the file is not modified.
+    """
+    try:
+        my_mtime = os.path.getmtime(my_file)
+    except OSError:
+        my_mtime = None
+
+    my_cached = _ad_vip_cache.get(my_file)
+    if (my_cached is not None and
+            my_mtime is not None and
+            my_cached[0] == my_mtime):
+        print('\n\nReusing AD VIP group data read from {0}\n\n'.format(
+                                                                my_file
+                                                                ))
+        return my_cached[1]
+
+    df_ad_vip = pd.io.parsers.read_csv(
+                        my_file,
+                        sep=gbls.SEP2,
+                        error_bad_lines=False,
+                        warn_bad_lines=True,
+                        quotechar='"',
+                        comment=gbls.HASH,
+                        encoding='utf-16')
+
+    _ad_vip_cache[my_file] = (my_mtime, df_ad_vip)
+    return df_ad_vip
+
+
 class PluginOne(IPlugin):
     def print_name(self):
         print (
@@ -188,14 +225,7 @@ class PluginOne(IPlugin):
             print('\n\nEntering plugin1 - _classify_using_ad_grps\n\n')
 
             try:
-                df_ad_vip = pd.io.parsers.read_csv(
-                                    gbls.ad_vip_grps,
-                                    sep=gbls.SEP2,
-                                    error_bad_lines=False,
-                                    warn_bad_lines=True,
-                                    quotechar='"',
-                                    comment=gbls.HASH,
-                                    encoding='utf-16')
+                df_ad_vip = _read_ad_vip_grps(gbls.ad_vip_grps)
 
             except IOError as e:
                 print('\n\n***I/O error({0}): {1}\n\n'.format(
@@ -104,11 +104,19 @@ class SccmHosts(object):
             df_sys_tmp = pd.io.parsers.read_csv(
                                     mydir,
                                     sep=gbls.SEP,
+                                    usecols=[
+                                        'ResourceID',
+                                        'Active0',
+                                        'AD_Site_Name0',
+                                        'Distinguished_Name0',
+                                        'Resource_Domain_OR_Workgr0'
+                                        ],
                                     error_bad_lines=False,
                                     warn_bad_lines=True,
                                     quotechar='"',
                                     encoding='utf-16')
             # Note the use of utf-16 for this data.
+            # Only the columns kept below are parsed.
         except IOError as e:
             self.logger.critical('\n\n***I/O error({0}): {1}\n\n'.format(
                         e.errno, e.strerror))
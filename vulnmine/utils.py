@@ -4,12 +4,18 @@ setup_logging: Initialize logging
 
 init_globals: Initialize global variables
 
+get_zip_to: Download a zipped file and extract it straight to disk
+
+parallel_map: Apply a function to a list of items using worker processes
+
 """
 import os
+import multiprocessing
 import json
 import logging.config
-import StringIO as strIO
 import zipfile as zipf
+import tempfile
+import shutil
 
 import requests
 from yapsy.PluginManager import PluginManager
@@ -20,6 +26,12 @@ import gbls
 
 utils_logger = logging.getLogger(__name__)
 
+# Downloaded archives larger than this are spooled to a temporary file
+_ZIP_SPOOL_SIZE = 16 * 1024 * 1024
+
+# Chunk size used to stream downloads and extracted files
+_COPY_CHUNK = 1024 * 1024
+
 
 def setup_logging(
         default_path=gbls.pkgdir + 'logging.json',
@@ -252,7 +264,14 @@ def load_plugins():
 
     1. Sets yapsy logger's logging level to the global default.
     2. Loads the (one and only) plugin from the plugin directory.
-    3. Invokes the plugin's "print_name" method to print the name.
+       The load is skipped if the plugins were already loaded from the
+       same plugin directory and the directory's modification time is
+       unchanged. Note that editing a plugin .py file in place does not
+       change the directory's modification time, so such an edit is not
+       picked up until the process restarts.
+    3. Keeps references to the input and report plugin objects as
+       gbls.plugin_input and gbls.plugin_rpt.
+    4. Invokes the plugin's "print_name" method to print the name.
 
     Return Value
     ============
@@ -273,10 +292,39 @@ def load_plugins():
     # Set logging for the yapsy plugin framework
     logging.getLogger('yapsy').setLevel(gbls.loglvl)
 
+    # Reuse the plugins already loaded from the same, unchanged directory
+    try:
+        folder_mtime = os.path.getmtime(gbls.plugin_folder)
+    except OSError:
+        folder_mtime = None
+
+    folder_key = (gbls.plugin_folder, folder_mtime)
+
+    if (gbls.plugin_manager is not None and
+            folder_mtime is not None and
+            folder_key == gbls.plugin_folder_key):
+        utils_logger.info(
+                'load_plugins: Plugins already loaded from {0}'.format(
+                                        gbls.plugin_folder
+                                        )
+                )
+        return None
+
     # Load the plugins from the plugin directory.
     gbls.plugin_manager = PluginManager()
     gbls.plugin_manager.setPluginPlaces([gbls.plugin_folder])
     gbls.plugin_manager.collectPlugins()
+    gbls.plugin_folder_key = folder_key
+
+    # Keep the plugin objects to avoid repeated lookups by name
+    plugin_ip = gbls.plugin_manager.getPluginByName(gbls.PLUGINIP)
+    gbls.plugin_input = (
+            None if plugin_ip is None else plugin_ip.plugin_object
+            )
+    plugin_rpt = gbls.plugin_manager.getPluginByName(gbls.PLUGINRPT)
+    gbls.plugin_rpt = (
+            None if plugin_rpt is None else plugin_rpt.plugin_object
+            )
 
     # Loop through the plugins and print their names.
     for plugin in gbls.plugin_manager.getAllPlugins():
@@ -284,72 +332,160 @@ def load_plugins():
 
     return None
 
-def get_zip(myurl):
-    """Download and unzip a file
+def get_zip_to(myurl, mydest, mysession=None):
+    """Download a zipped file and extract it straight to disk
 
-    This utility rtn downloads a file given the URL and then unzips it.
+    This utility rtn downloads a file given the URL and unzips it into the
+    destination file. Neither the archive nor the extracted file is held in
+    memory: the download is streamed into a temporary file and the archive
+    member is copied to disk in chunks. The destination file is only
+    replaced once the whole member has been extracted.
 
     Parameters
     ==========
 
     myurl   The URL of the file to be downloaded
 
+    mydest  Name of the file to which the extracted data is written
+
+    mysession
+            Optional requests.Session used for the download, so that
+            connections can be reused across several downloads.
+
     Returns
     =======
-    (file_name, extracted_file)
-            Filename    Name in file in the zip archive
-            extracted_file
-                        Contents of file
+    file_name   Name of the file in the zip archive
 
-            (None, None) is returned if an error is detected.
+                None is returned if an error is detected. The destination
+                file is then left untouched.
 
     Exceptions
     ==========
-    RequestException:   The requests module, used for https access, has
-                    several exception conditions.
+    RequestException, BadZipfile, IOError:
+                Download errors (including HTTP error statuses) and
+                extraction errors are logged and None is returned.
 
     Restrictions
     ============
 
     This rtn is designed to be used for NIST XML file downloads.
     The assumption is that the archive contains only 1 XML in zipped format.
-    The contents of the file are read into memory.
 
     """
     utils_logger.info(
-        '\n\nEntering get_zip to read {0}\n\n'.format(
+        '\n\nEntering get_zip_to to read {0}\n\n'.format(
                                             myurl
                                             )
         )
 
-    try:
-        resp = requests.get(myurl)
+    with tempfile.SpooledTemporaryFile(max_size=_ZIP_SPOOL_SIZE) as fd_zip:
+
+        try:
+            if mysession is None:
+                resp = requests.get(myurl, stream=True)
+            else:
+                resp = mysession.get(myurl, stream=True)
+
+            try:
+                resp.raise_for_status()
+                for my_chunk in resp.iter_content(chunk_size=_COPY_CHUNK):
+                    fd_zip.write(my_chunk)
+            finally:
+                resp.close()
+
+        except requests.exceptions.RequestException as e:
+                utils_logger.critical(
+                    '\n\n***NVD XML feeds - Error: \n{0}\n{1}\n\n'.format(
+                        myurl,
+                        e
+                        )
+                    )
+                return None
+
+        # unzip compressed archive into a temporary file, which replaces
+        # the destination only once the archive member has been checked
+        my_tmp = mydest + '.tmp'
 
-    except requests.exceptions.RequestException as e:
+        try:
+            fd_zip.seek(0)
+            with zipf.ZipFile(fd_zip) as my_zipfile:
+                zip_names = my_zipfile.namelist()
+
+                # should be only 1 file in the archive
+                if len(zip_names) != 1:
+                    utils_logger.critical(
+                        'get_zip_to: Error in extracting NVD zip file'
+                        )
+                    return None
+
+                file_name = zip_names.pop()
+                with my_zipfile.open(file_name) as fd_member, \
+                        open(my_tmp, 'wb') as fd_dest:
+                    shutil.copyfileobj(fd_member, fd_dest, _COPY_CHUNK)
+
+            os.rename(my_tmp, mydest)
+
+        except (zipf.BadZipfile, IOError) as e:
+            if os.path.isfile(my_tmp):
+                os.remove(my_tmp)
             utils_logger.critical(
-                '\n\n***NVD XML feeds - Error: \n{0}\n{0}\n\n'.format(
+                '\n\n***get_zip_to: Error in extracting NVD zip file'
+                '\n{0}\n{1}\n\n'.format(
                     myurl,
                     e
                     )
                 )
-            return (None, None)
+            return None
+
+    utils_logger.info(
+        'get_zip_to: Successfully extracted {0} to {1}'.format(
+                                                    file_name,
+                                                    mydest
+                                                    )
+        )
+    return file_name
 
-    # unzip compressed archive
-    my_zipfile = zipf.ZipFile(strIO.StringIO(resp.content))
-    zip_names = my_zipfile.namelist()
+def parallel_map(my_func, my_items):
+    """Apply a function to a list of items using a pool of worker processes
 
-    # should be only 1 file in the archive
-    if len(zip_names) == 1:
-        file_name = zip_names.pop()
-        extracted_file = my_zipfile.open(file_name).read()
-        utils_logger.info(
-            'get_zip: Successfully extracted {0}'.format(
-                                                        file_name
+    Parameters
+    ==========
+
+    my_func     Function to apply. This must be a module-level function so
+                that it can be pickled for the worker processes.
+
+    my_items    List of items. Each item, and each result, must be picklable.
+
+    Returns
+    =======
+    List of results, in the same order as my_items.
+
+    Restrictions
+    ============
+
+    The number of worker processes is given by gbls.num_workers (0 for
+    all available CPUs). The items are processed serially if there is only
+    1 worker or fewer than 2 items.
+
+    """
+    num_workers = gbls.num_workers
+    if not num_workers:
+        num_workers = multiprocessing.cpu_count()
+    num_workers = min(num_workers, len(my_items))
+
+    if num_workers < 2:
+        return map(my_func, my_items)
+
+    utils_logger.info(
+        'parallel_map: Using {0} worker processes for {1} items'.format(
+                                                        num_workers,
+                                                        len(my_items)
                                                         )
-            )
-        return (file_name, extracted_file)
-    else:
-        utils_logger.critical(
-            'get_zip: Error in extracting NVD zip file'
-            )
-        return (None, None)
+        )
+
+    my_pool = multiprocessing.Pool(processes=num_workers)
+    try:
+        return my_pool.map(my_func, my_items)
+    finally:
+        my_pool.close()
+        my_pool.join()
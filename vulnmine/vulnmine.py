@@ -90,8 +90,7 @@ def rd_sccm_hosts():
 
     # Invoke Input plugin for customized I/P data
     if gbls.activate_plugins:
-        plugin1 = gbls.plugin_manager.getPluginByName(gbls.PLUGINIP)
-        plugin1.plugin_object.modify_hosts(hosts)
+        gbls.plugin_input.modify_hosts(hosts)
 
 def rd_sccm_sft():
     """Read SCCM software inventory data"""
@@ -132,7 +131,7 @@ def match_vendors():
     match_vendor = matchven.MatchVendor()
 
     match_vendor.match(
-                cpe.get(),
+                cpe.get(copy=False),
                 sft.get()
                 )
     match_vendor.save()
@@ -158,7 +157,7 @@ def match_sft():
     match_soft.match(
             match_vendor.get(),
             sft.get(),
-            cpe.get()
+            cpe.get(copy=False)
             )
     match_soft.save()
 
@@ -183,7 +182,7 @@ def upd_hosts_vulns():
 
     match_vulns.data_merge(
                 cve.get(),
-                match_soft.get(),
+                match_soft.get(copy=False),
                 sft.get(),
                 hosts.get()
                 )
@@ -198,8 +197,7 @@ def output_stats():
 
     # Invoke Report plugin for customized stats
     if gbls.activate_plugins:
-        plugin2 = gbls.plugin_manager.getPluginByName(gbls.PLUGINRPT)
-        plugin2.plugin_object.custom_stats(match_vulns)
+        gbls.plugin_rpt.custom_stats(match_vulns)
 
 def do_all():
     rd_sccm_hosts()